@@ -0,0 +1,199 @@
+import sys
+from typing import Dict, List, NamedTuple, Optional, Set
+from norma import (
+    OP_ADD, OP_SUB, OP_SE, OP_VA, OP_MACRO,
+    Biblioteca, ProgramaCompilado, compilar_programa, ler_programas, registradores_por_programa,
+)
+
+# ============================
+# Diagnósticos
+# ============================
+class Diagnostico(NamedTuple):
+    arquivo: str
+    linha: int
+    gravidade: str      # "erro" ou "aviso"
+    mensagem: str
+
+    def __str__(self) -> str:
+        return f"{self.arquivo}:{self.linha}: {self.gravidade}: {self.mensagem}"
+
+
+# ============================
+# Verificação das linhas (a partir do que o compilador registrou)
+# ============================
+def diagnosticos_compilacao(cp: ProgramaCompilado) -> List[Diagnostico]:
+    # cada OP_ABORTA é um ponto em que a execução pararia em silêncio
+    diagnosticos = [Diagnostico(cp.arquivo, cp.linhas[pc], "erro", motivo) for pc, motivo in cp.motivos.items()]
+    for linha, destino in cp.saltos_invalidos:
+        diagnosticos.append(Diagnostico(cp.arquivo, linha, "erro", f"va_para para a linha {destino}, que não existe"))
+    for linha, bloco in cp.ignorados:
+        diagnosticos.append(Diagnostico(cp.arquivo, linha, "aviso", f"instrução desconhecida ignorada: '{bloco}'"))
+    diagnosticos.sort(key=lambda d: d.linha)
+    return diagnosticos
+
+
+def verificar_programa(
+    programas: Dict[str, Dict[int, str]],
+    arquivo: str,
+    n_regs: int = 7,
+) -> List[Diagnostico]:
+    if not programas.get(arquivo):
+        return [Diagnostico(arquivo, 0, "aviso", "programa vazio ou inexistente")]
+    return diagnosticos_compilacao(compilar_programa(programas, arquivo, n_regs))
+
+
+# ============================
+# Grafo de chamadas e recursão
+# ============================
+def componentes_recursivas(grafo: Dict[str, List[str]]) -> List[List[str]]:
+    # Tarjan iterativo: componentes fortemente conexas com ciclo
+    indice: Dict[str, int] = {}
+    menor: Dict[str, int] = {}
+    na_pilha: Set[str] = set()
+    pilha: List[str] = []
+    componentes: List[List[str]] = []
+    for raiz in sorted(grafo):
+        if raiz in indice:
+            continue
+        trabalho = [(raiz, 0)]
+        while trabalho:
+            no, proximo = trabalho.pop()
+            if proximo == 0:
+                indice[no] = menor[no] = len(indice)
+                pilha.append(no)
+                na_pilha.add(no)
+            vizinhos = grafo.get(no, [])
+            for k in range(proximo, len(vizinhos)):
+                w = vizinhos[k]
+                if w not in indice:
+                    trabalho.append((no, k + 1))
+                    trabalho.append((w, 0))
+                    break
+                if w in na_pilha:
+                    menor[no] = min(menor[no], indice[w])
+            else:
+                if menor[no] == indice[no]:
+                    componente = []
+                    while True:
+                        w = pilha.pop()
+                        na_pilha.discard(w)
+                        componente.append(w)
+                        if w == no:
+                            break
+                    if len(componente) > 1 or no in grafo.get(no, []):
+                        componentes.append(sorted(componente))
+                if trabalho:
+                    pai = trabalho[-1][0]
+                    menor[pai] = min(menor[pai], menor[no])
+    return componentes
+
+
+def linhas_inalcancaveis(cp) -> List[int]:
+    # percorre o código compilado a partir do início do programa
+    if not cp.inicio:
+        return []
+    vistos = {0}
+    pendentes = [0]
+    while pendentes:
+        pc = pendentes.pop()
+        op = cp.ops[pc]
+        if op in (OP_ADD, OP_SUB, OP_MACRO):
+            seguintes = (pc + 1,)
+        elif op == OP_SE:
+            seguintes = (pc + 1, cp.alvos[pc])
+        elif op == OP_VA:
+            seguintes = (cp.alvos[pc],)
+        else:
+            seguintes = ()
+        for s in seguintes:
+            if s not in vistos:
+                vistos.add(s)
+                pendentes.append(s)
+    alcancadas = {cp.linhas[pc] for pc in vistos}
+    return [ln for ln in cp.inicio if ln not in alcancadas]
+
+
+# ============================
+# Relatório completo de uma biblioteca de macros
+# ============================
+class Relatorio:
+    def __init__(self, n_regs: int):
+        self.n_regs = n_regs
+        self.diagnosticos: List[Diagnostico] = []
+        self.chamadas: Dict[str, List[str]] = {}      # grafo: programa -> macros chamadas
+        self.recursivas: List[List[str]] = []
+        self.leitura: Dict[str, str] = {}             # registradores lidos, ex.: "abd"
+        self.escrita: Dict[str, str] = {}
+        self.necessarios: Dict[str, int] = {}         # registradores que uma execução precisa
+        self.inalcancaveis: Dict[str, List[int]] = {}
+
+    @property
+    def erros(self) -> List[Diagnostico]:
+        return [d for d in self.diagnosticos if d.gravidade == "erro"]
+
+    @property
+    def ok(self) -> bool:
+        return not self.erros
+
+    def registradores_necessarios(self, arquivo: str) -> int:
+        # quantos registradores (a partir de 'a') uma execução de arquivo precisa
+        return self.necessarios.get(arquivo, 0)
+
+
+def analisar(
+    programas: Dict[str, Dict[int, str]],
+    n_regs: int = 7,
+    arquivos: Optional[List[str]] = None,
+) -> Relatorio:
+    rel = Relatorio(n_regs)
+    bib = Biblioteca(programas, n_regs)
+    for arquivo in sorted(programas if arquivos is None else arquivos):
+        cp = bib.compilados[bib.id_de(arquivo)]
+        if programas.get(arquivo):
+            rel.diagnosticos.extend(diagnosticos_compilacao(cp))
+        else:
+            rel.diagnosticos.append(Diagnostico(arquivo, 0, "aviso", "programa vazio ou inexistente"))
+
+    leitura, escrita = registradores_por_programa(bib)
+    for arquivo, pid in bib.ids.items():
+        if arquivo not in programas:
+            continue
+        cp = bib.compilados[pid]
+        rel.chamadas[arquivo] = list(cp.macros)
+        rel.leitura[arquivo] = "".join(chr(ord("a") + r) for r in leitura[pid])
+        rel.escrita[arquivo] = "".join(chr(ord("a") + r) for r in escrita[pid])
+        rel.necessarios[arquivo] = max(leitura[pid] + escrita[pid], default=-1) + 1
+        mortas = linhas_inalcancaveis(cp)
+        if mortas:
+            rel.inalcancaveis[arquivo] = mortas
+            for ln in mortas:
+                rel.diagnosticos.append(Diagnostico(arquivo, ln, "aviso", "linha inalcançável"))
+
+    rel.recursivas = componentes_recursivas(rel.chamadas)
+    for componente in rel.recursivas:
+        for arquivo in componente:
+            rel.diagnosticos.append(Diagnostico(
+                arquivo, 0, "aviso", "recursão: " + " -> ".join(componente + componente[:1])
+            ))
+    rel.diagnosticos.sort(key=lambda d: (d.arquivo, d.linha))
+    return rel
+
+
+def imprimir_relatorio(rel: Relatorio, arquivo=sys.stdout) -> None:
+    for d in rel.diagnosticos:
+        print(d, file=arquivo)
+    print(file=arquivo)
+    print(f"{'programa':<20} {'lê':<8} {'escreve':<8} {'regs':>4} chama", file=arquivo)
+    for nome in sorted(rel.chamadas):
+        print(f"{nome:<20} {rel.leitura[nome]:<8} {rel.escrita[nome]:<8} {rel.necessarios[nome]:>4} "
+              f"{', '.join(rel.chamadas[nome]) or '-'}", file=arquivo)
+    print(f"\n{len(rel.erros)} erro(s), {len(rel.diagnosticos) - len(rel.erros)} aviso(s)", file=arquivo)
+
+
+if __name__ == "__main__":
+    # uso: python analise.py [pasta] [n_regs]; sai com código 1 se houver erros (para CI)
+    pasta = sys.argv[1] if len(sys.argv) > 1 else "macros"
+    n_regs = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    relatorio = analisar(ler_programas(pasta), n_regs)
+    imprimir_relatorio(relatorio)
+    sys.exit(0 if relatorio.ok else 1)
@@ -2,8 +2,16 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import os
-from typing import List
-from norma import Registrador, ler_programas, executar_com_logs
+import queue
+import threading
+import time
+from typing import List, Tuple
+from norma import BancoRegistradores, CacheProgramas, indice_registrador, rastrear, formatar_passo
+from depuracao import Depurador, formatar_momento
+
+MAX_LINHAS_LOG = 5000          # janela de linhas mantida no widget de log
+LINHAS_POR_LOTE = 500          # linhas enviadas de uma vez pela thread de execução
+INTERVALO_ATUALIZACAO_MS = 50  # período do polling da fila com after()
 
 class NormaApp(tk.Tk):
     # ============================
@@ -17,6 +25,15 @@ class NormaApp(tk.Tk):
         self.registradores_widgets: List[tk.Entry] = []
         self.macros_dir = "macros"
         self.current_file_path = ""
+        self.cache_programas = CacheProgramas(self.macros_dir)
+
+        self._worker: threading.Thread = None
+        self._fila: queue.Queue = queue.Queue()
+        self._cancelar = threading.Event()
+        self._passos = 0
+        self._inicio_execucao = 0.0
+        self._depurador: Depurador = None
+        self._depurando = False
 
         self.create_widgets()
         self.update_register_entries()
@@ -38,6 +55,10 @@ class NormaApp(tk.Tk):
         self.num_regs_spinbox = ttk.Spinbox(controls_frame, from_=1, to=26, width=5, command=self.update_register_entries)
         self.num_regs_spinbox.set(3)
         self.num_regs_spinbox.grid(row=0, column=1, sticky="w")
+        ttk.Label(controls_frame, text="Limite de passos:").grid(row=0, column=2, padx=(15, 5), sticky="w")
+        self.step_limit_entry = ttk.Entry(controls_frame, width=10)
+        self.step_limit_entry.insert(0, "100000")
+        self.step_limit_entry.grid(row=0, column=3, sticky="w")
         
         regs_container = ttk.LabelFrame(left_frame, text="Valores Iniciais dos Registradores", padding="10")
         regs_container.pack(fill=tk.X, pady=(0, 10))
@@ -75,6 +96,28 @@ class NormaApp(tk.Tk):
         final_state_frame.pack(fill=tk.X)
         self.final_state_label = ttk.Label(final_state_frame, text="Aguardando execução...", font=("Courier New", 10))
         self.final_state_label.pack()
+        self.speed_label = ttk.Label(final_state_frame, text="", font=("Courier New", 9))
+        self.speed_label.pack()
+
+        debug_frame = ttk.LabelFrame(right_frame, text="Depuração (volta no tempo)", padding="10")
+        debug_frame.pack(fill=tk.X, pady=(10, 0))
+        debug_buttons = ttk.Frame(debug_frame)
+        debug_buttons.pack(fill=tk.X)
+        self.back_line_button = ttk.Button(debug_buttons, text="<< Voltar até a linha", command=self.debug_back_to_line)
+        self.back_button = ttk.Button(debug_buttons, text="< Voltar", command=lambda: self._acao_depuracao(lambda d: d.voltar()))
+        self.step_button = ttk.Button(debug_buttons, text="Avançar >", command=lambda: self._acao_depuracao(lambda d: d.avancar()))
+        self.continue_button = ttk.Button(debug_buttons, text="Continuar >>", command=self.debug_continue)
+        self.last_change_button = ttk.Button(debug_buttons, text="Última mudança de", command=self.debug_last_change)
+        self.debug_reg_entry = ttk.Entry(debug_buttons, width=4)
+        self.debug_reg_entry.insert(0, "a")
+        self.debug_buttons = [self.back_line_button, self.back_button, self.step_button, self.continue_button, self.last_change_button]
+        for botao in self.debug_buttons:
+            botao.pack(side=tk.LEFT, padx=(0, 5))
+            botao.config(state="disabled")
+        self.debug_reg_entry.pack(side=tk.LEFT)
+        self.debug_label = ttk.Label(debug_frame, text="Use 'Depurar Arquivo Aberto' para iniciar.", font=("Courier New", 9))
+        self.debug_label.pack(anchor="w", pady=(5, 0))
+        self.code_text.tag_configure("DEBUG", background="#fff3a0")
 
         action_frame = ttk.Frame(self)
         action_frame.pack(pady=10)
@@ -84,6 +127,12 @@ class NormaApp(tk.Tk):
         self.execute_current_button = ttk.Button(action_frame, text="Executar Arquivo Aberto", command=self.run_current_file_simulation)
         self.execute_current_button.pack(side=tk.LEFT, padx=5)
         
+        self.debug_start_button = ttk.Button(action_frame, text="Depurar Arquivo Aberto", command=self.start_debugging)
+        self.debug_start_button.pack(side=tk.LEFT, padx=5)
+
+        self.cancel_button = ttk.Button(action_frame, text="Cancelar", command=self.cancel_simulation, state="disabled")
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+
         self.clear_button = ttk.Button(action_frame, text="Limpar", command=self.clear_results)
         self.clear_button.pack(side=tk.LEFT, padx=5)
 
@@ -91,45 +140,258 @@ class NormaApp(tk.Tk):
     # Contém a lógica central para executar a simulação
     # ============================
     def _execute_logic(self, start_file: str):
+        if self._worker is not None and self._worker.is_alive():
+            return
         self.save_editor_to_file()
-        
+
         self.log_output.config(state="normal")
         self.log_output.delete("1.0", tk.END)
-        self.final_state_label.config(text="Executando...")
+        self.log_output.config(state="disabled")
+        self.speed_label.config(text="")
 
         if not start_file:
             messagebox.showerror("Erro", "Nenhum arquivo selecionado para executar.")
             return
 
-        regs = []
         try:
-            for i, entry in enumerate(self.registradores_widgets):
-                nome = chr(ord('a') + i)
-                valor = int(entry.get())
-                regs.append(Registrador(nome, valor))
+            regs = BancoRegistradores([int(entry.get()) for entry in self.registradores_widgets])
+            limite_passos = int(self.step_limit_entry.get())
         except ValueError:
-            messagebox.showerror("Entrada Inválida", "Valores dos registradores devem ser inteiros.")
+            messagebox.showerror("Entrada Inválida", "Valores dos registradores e o limite de passos devem ser inteiros.")
             return
-            
-        try:
-            programas = ler_programas(self.macros_dir)
-            final_regs, log_completo = executar_com_logs(programas, regs, start_file)               
-            for linha in log_completo:
-                partes = linha.split("|", 1)
-                tag = "STATE"
-                if len(partes) == 2:
-                    tag, texto = partes;
-                    if not texto.strip(): continue
-                    self.log_output.insert(tk.END, texto + "\n", tag)
-                else:
-                    self.log_output.insert(tk.END, linha + "\n", tag)
 
-            self.final_state_label.config(text=str(final_regs))
+        try:
+            programas = self.cache_programas.carregar()
         except Exception as e:
             messagebox.showerror("Erro de Execução", f"Ocorreu um erro inesperado: {e}")
+            return
+        if self._depurador is not None and self.cache_programas.alterados:
+            # o depurador tem a própria cópia dos programas: segue com a versão antiga
+            self.debug_label.config(text="Programas alterados: a depuração usa a versão de quando foi iniciada.")
+
+        self.final_state_label.config(text="Executando...")
+        self._fila = queue.Queue(maxsize=200)
+        self._cancelar.clear()
+        self._passos = 0
+        self._inicio_execucao = time.perf_counter()
+        self._worker = threading.Thread(
+            target=self._run_worker,
+            args=(programas, regs, start_file, limite_passos, self._fila),
+            daemon=True,
+        )
+        self._set_running(True)
+        self._worker.start()
+        self.after(INTERVALO_ATUALIZACAO_MS, self._poll_execution)
+
+    # ============================
+    # Roda a simulação fora da thread do Tk; só fala com a interface pela fila
+    # ============================
+    def _run_worker(self, programas, regs, start_file, limite_passos, fila):
+        nomes = list(regs.nomes)
+        lote: List[Tuple[str, str]] = []
+        try:
+            for passo in rastrear(programas, regs, start_file, limite_passos):
+                if self._cancelar.is_set():
+                    lote.append(("ERROR", "Execução cancelada pelo usuário."))
+                    break
+                if passo.tipo == "STATE":
+                    self._passos += 1
+                tag, texto = formatar_passo(passo, programas, nomes).split("|", 1)
+                lote.append((tag, texto))
+                if len(lote) >= LINHAS_POR_LOTE:
+                    fila.put(("log", lote))
+                    lote = []
+            fila.put(("log", lote))
+            fila.put(("fim", str(regs)))
+        except Exception as e:
+            fila.put(("log", lote))
+            fila.put(("erro", e))
+
+    # ============================
+    # Consome a fila em lotes e atualiza o log e a taxa de passos
+    # ============================
+    def _poll_execution(self):
+        lotes = []
+        final = None
+        try:
+            while final is None:
+                tipo, dado = self._fila.get_nowait()
+                if tipo == "log":
+                    lotes.append(dado)
+                else:
+                    final = (tipo, dado)
+        except queue.Empty:
+            pass
+
+        # só as últimas MAX_LINHAS_LOG linhas chegam a ser inseridas no widget
+        linhas: List[Tuple[str, str]] = []
+        for lote in reversed(lotes):
+            linhas[:0] = lote[-(MAX_LINHAS_LOG - len(linhas)):]
+            if len(linhas) >= MAX_LINHAS_LOG:
+                break
+        if linhas:
+            self._append_log(linhas)
+
+        decorrido = time.perf_counter() - self._inicio_execucao
+        taxa = self._passos / decorrido if decorrido > 0 else 0
+        self.speed_label.config(text=f"{self._passos} passos | {taxa:,.0f} passos/s")
+
+        if final is None:
+            self.after(INTERVALO_ATUALIZACAO_MS, self._poll_execution)
+            return
+        self._set_running(False)
+        tipo, dado = final
+        if tipo == "fim":
+            self.final_state_label.config(text=dado)
+        else:
+            messagebox.showerror("Erro de Execução", f"Ocorreu um erro inesperado: {dado}")
             self.final_state_label.config(text="Erro durante a execução.")
-        finally:
-            self.log_output.config(state="disabled")
+
+    def _append_log(self, linhas: List[Tuple[str, str]]):
+        partes = []
+        for tag, texto in linhas:
+            if not texto.strip():
+                continue
+            partes.extend((texto + "\n", tag))
+        if not partes:
+            return
+        self.log_output.config(state="normal")
+        self.log_output.insert(tk.END, *partes)
+        total = int(self.log_output.index("end-1c").split(".")[0]) - 1
+        if total > MAX_LINHAS_LOG:
+            self.log_output.delete("1.0", f"{total - MAX_LINHAS_LOG + 1}.0")
+        self.log_output.config(state="disabled")
+        self.log_output.see(tk.END)
+
+    # ============================
+    # Habilita/desabilita os botões conforme há uma execução em andamento
+    # ============================
+    def _set_running(self, ativo: bool):
+        estado = "disabled" if ativo else "normal"
+        self.execute_button.config(state=estado)
+        self.execute_current_button.config(state=estado)
+        self.clear_button.config(state=estado)
+        self.debug_start_button.config(state=estado)
+        self.cancel_button.config(state="normal" if ativo else "disabled")
+
+    # ============================
+    # Pede para a execução em andamento parar no próximo passo
+    # ============================
+    def cancel_simulation(self):
+        self._cancelar.set()
+
+    # ============================
+    # Depuração: navega para frente e para trás na execução do arquivo aberto
+    # ============================
+    def start_debugging(self):
+        if self._depurando:
+            return
+        start_file = self.macro_selector.get()
+        self.save_editor_to_file()
+        if not start_file:
+            messagebox.showerror("Erro", "Nenhum arquivo selecionado para depurar.")
+            return
+        try:
+            valores = [int(entry.get()) for entry in self.registradores_widgets]
+            programas = self.cache_programas.carregar()
+            self._depurador = Depurador(programas, start_file, valores)
+        except ValueError as e:
+            messagebox.showerror("Entrada Inválida", f"Não foi possível iniciar a depuração: {e}")
+            return
+        self.log_output.config(state="normal")
+        self.log_output.delete("1.0", tk.END)
+        self.log_output.config(state="disabled")
+        for botao in self.debug_buttons:
+            botao.config(state="normal")
+        self._mostrar_depuracao("")
+
+    def debug_continue(self):
+        try:
+            limite_passos = int(self.step_limit_entry.get())
+        except ValueError:
+            messagebox.showerror("Entrada Inválida", "O limite de passos deve ser um inteiro.")
+            return
+        self._acao_depuracao(lambda d: d.continuar(limite_passos))
+
+    def debug_back_to_line(self):
+        # a linha do programa sob o cursor do editor ("12: ...")
+        texto = self.code_text.get("insert linestart", "insert lineend")
+        numero = texto.split(":", 1)[0].strip()
+        if ":" not in texto or not numero.isdigit():
+            messagebox.showinfo("Depuração", "Posicione o cursor do editor numa linha numerada.")
+            return
+        arquivo, linha = self.macro_selector.get(), int(numero)
+
+        def acao(dep: Depurador):
+            if dep.voltar_ate_linha(arquivo, linha) is None:
+                return f"{arquivo}:{linha} não foi executada antes deste passo."
+        self._acao_depuracao(acao)
+
+    def debug_last_change(self):
+        nome = self.debug_reg_entry.get().strip()
+        if indice_registrador(nome, self._depurador.bib.n_regs) < 0:
+            messagebox.showerror("Entrada Inválida", f"Registrador inválido: '{nome}'")
+            return
+
+        def acao(dep: Depurador):
+            mudanca = dep.ultima_mudanca(nome)
+            if mudanca is None:
+                return f"{nome} não mudou até o passo {dep.passo}."
+            # para na linha que fez a alteração, antes de executá-la
+            dep.ir_para(mudanca.passo - 1)
+            return f"{nome}: {mudanca.antes} -> {mudanca.depois} no passo {mudanca.passo}"
+        self._acao_depuracao(acao)
+
+    def _acao_depuracao(self, acao):
+        # voltar pode refazer muitos passos: roda fora da thread do Tk
+        if self._depurador is None or self._depurando:
+            return
+        self._depurando = True
+        for botao in self.debug_buttons:
+            botao.config(state="disabled")
+        resultado: queue.Queue = queue.Queue()
+
+        def trabalhar():
+            try:
+                resultado.put(("ok", acao(self._depurador)))
+            except Exception as e:
+                resultado.put(("erro", e))
+        threading.Thread(target=trabalhar, daemon=True).start()
+        self.after(INTERVALO_ATUALIZACAO_MS, self._poll_depuracao, resultado)
+
+    def _poll_depuracao(self, resultado: queue.Queue):
+        try:
+            tipo, dado = resultado.get_nowait()
+        except queue.Empty:
+            self.after(INTERVALO_ATUALIZACAO_MS, self._poll_depuracao, resultado)
+            return
+        self._depurando = False
+        for botao in self.debug_buttons:
+            botao.config(state="normal")
+        if tipo == "erro":
+            messagebox.showerror("Erro de Depuração", f"Ocorreu um erro inesperado: {dado}")
+            return
+        self._mostrar_depuracao(dado if isinstance(dado, str) else "")
+
+    def _mostrar_depuracao(self, mensagem: str):
+        momento = self._depurador.posicao()
+        texto = formatar_momento(momento, self._depurador.programas)
+        linhas = [("INFO", mensagem)] if mensagem else []
+        self._append_log(linhas + [("INFO" if momento.concluida else "STATE", texto)])
+        self.debug_label.config(text=mensagem or f"Passo {momento.passo} de {self._depurador.fronteira} já executados")
+        self.final_state_label.config(text=str(self._depurador.regs))
+
+        # destaca no editor a próxima linha a executar
+        self.code_text.tag_remove("DEBUG", "1.0", tk.END)
+        if momento.concluida:
+            return
+        if momento.arquivo != self.macro_selector.get():
+            self.macro_selector.set(momento.arquivo)
+            self.on_file_select()
+        inicio = self.code_text.search(rf"^\s*{momento.linha}\s*:", "1.0", regexp=True)
+        if inicio:
+            self.code_text.tag_add("DEBUG", f"{inicio} linestart", f"{inicio} lineend")
+            self.code_text.see(inicio)
 
     # ============================
     # Executa a simulação a partir do arquivo main.txt
@@ -0,0 +1,320 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+from norma import (
+    BancoRegistradores, Biblioteca, Execucao, executar,
+    executar_com_logs, ler_programas, obter_biblioteca, quebrar_em_blocos,
+)
+import transpilar
+
+# ======================================
+# Programas sintéticos com muitas linhas
+# ======================================
+def gerar_programa_linear(n_linhas: int) -> Dict[int, str]:
+    # linhas 1..n-1 somam em b; a linha n repete o bloco enquanto a > 0
+    prog = {ln: "add_b" for ln in range(1, n_linhas)}
+    prog[n_linhas] = f"se zero_a entao va_para {n_linhas + 2} senao faca sub_a va_para 1"
+    prog[n_linhas + 2] = ""
+    return prog
+
+
+def passos_programa_linear(n_linhas: int, a: int) -> int:
+    return (a + 1) * n_linhas + 1
+
+
+def gerar_cadeia_macros(profundidade: int) -> Dict[str, Dict[int, str]]:
+    # cadeia0 chama cadeia1, que chama cadeia2...; cada nível soma 1 em b
+    programas = {}
+    for i in range(profundidade):
+        prog = {1: "add_b"}
+        if i + 1 < profundidade:
+            prog[2] = f"m_cadeia{i + 1}"
+        programas[f"cadeia{i}.txt"] = prog
+    return programas
+
+
+# ======================================
+# Mede passos/segundo para tamanhos crescentes
+# ======================================
+def medir_escalabilidade(
+    tamanhos: List[int],
+    passos_alvo: int = 200_000,
+) -> List[Tuple[int, float, int, float]]:
+    resultados = []
+    for n_linhas in tamanhos:
+        programas = {"sintetico.txt": gerar_programa_linear(n_linhas)}
+        a = max(1, passos_alvo // n_linhas)
+
+        # compila uma vez e cronometra exatamente o código que vai rodar; sem
+        # aceleração nem memo, para medir a interpretação linha a linha
+        inicio = time.perf_counter()
+        bib = Biblioteca(programas, 2)
+        ex = Execucao(bib, "sintetico.txt", [a, 0])
+        tempo_compilacao = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        ex.rodar(acelerar=False, memoizar=False)
+        decorrido = time.perf_counter() - inicio
+
+        passos = ex.passos
+        resultados.append((n_linhas, tempo_compilacao, passos, passos / decorrido if decorrido else float("inf")))
+    return resultados
+
+
+# ======================================
+# Interpretador de referência que relê o texto a cada linha
+# ======================================
+def executar_por_texto(programas: Dict[str, Dict[int, str]], valores: List[int], arquivo: str) -> int:
+    # mesmo algoritmo do interpretador original (sem compilação); devolve os passos
+    prog = programas.get(arquivo)
+    if not prog:
+        return 0
+    linhas = sorted(prog)
+    atual = linhas[0]
+    passos = 0
+    while True:
+        passos += 1
+        blocos = quebrar_em_blocos(prog[atual])
+        i = 0
+        while i < len(blocos):
+            b = blocos[i]
+            if b.startswith("faca "):
+                b = b.split(" ", 1)[1]
+            if b.startswith("se zero_"):
+                idx = ord(b.split("zero_", 1)[1]) - ord("a")
+                try:
+                    idx_senao = blocos.index("senao", i + 1)
+                except ValueError:
+                    return passos
+                ini_true = i + 1
+                if ini_true < len(blocos) and blocos[ini_true] == "entao":
+                    ini_true += 1
+                escolhido = blocos[ini_true:idx_senao] if valores[idx] == 0 else blocos[idx_senao + 1:]
+                blocos = blocos[:i] + escolhido
+                continue
+            if b.startswith("va_para"):
+                atual = int(b.split()[1])
+                if atual not in prog:
+                    return passos
+                break
+            if b.startswith("add_"):
+                valores[ord(b[4:]) - ord("a")] += 1
+            elif b.startswith("sub_"):
+                idx = ord(b[4:]) - ord("a")
+                if valores[idx]:
+                    valores[idx] -= 1
+            elif b.startswith("m_"):
+                passos += executar_por_texto(programas, valores, b[2:] + ".txt")
+            i += 1
+        else:
+            posicao = linhas.index(atual) + 1
+            if posicao == len(linhas):
+                return passos
+            atual = linhas[posicao]
+
+
+# ======================================
+# Compara os motores: texto, código decodificado e Python transpilado
+# ======================================
+def _medir(rodar: Callable[[], int]) -> Tuple[int, float]:
+    inicio = time.perf_counter()
+    passos = rodar()
+    return passos, time.perf_counter() - inicio
+
+
+def comparar_motores(
+    programas: Dict[str, Dict[int, str]],
+    arquivo: str,
+    valores: List[int],
+    acelerar: bool = False,
+) -> Dict[str, Tuple[int, float]]:
+    # (passos, passos/s) por motor; sem aceleração todos executam cada linha
+    bib = obter_biblioteca(programas, len(valores))
+    funcao = transpilar.transpilar(bib, arquivo, acelerar)
+
+    def decodificado() -> int:
+        ex = Execucao(bib, arquivo, list(valores))
+        ex.rodar(acelerar=acelerar, memoizar=False)
+        return ex.passos
+
+    motores = {
+        "decodificado": decodificado,
+        "transpilado": lambda: funcao(list(valores), 0),
+    }
+    if not acelerar:
+        motores = {"texto": lambda: executar_por_texto(programas, list(valores), arquivo), **motores}
+    resultados = {}
+    for nome, rodar in motores.items():
+        passos, decorrido = _medir(rodar)
+        resultados[nome] = (passos, passos / decorrido if decorrido else float("inf"))
+    return resultados
+
+
+# ======================================
+# Suíte de desempenho: macros do projeto e programas gerados
+# ======================================
+VERSAO_SUITE = 1
+LIMITE_PASSOS_LOG = 200_000   # executar_com_logs guarda uma linha de texto por passo
+
+
+def casos_da_suite(pasta: str = "macros") -> List[Tuple[str, Dict[str, Dict[int, str]], str, List[int]]]:
+    # (nome do caso, programas, arquivo de entrada, registradores iniciais)
+    macros = ler_programas(pasta)
+    casos = []
+    for n in (10, 100, 1_000):
+        casos.append((f"multi a={n} b={n}", macros, "multi.txt", [n, n, 0, 0, 0, 0, 0]))
+    for a, b in ((2, 4), (3, 5), (4, 6)):
+        casos.append((f"pot a={a} b={b}", macros, "pot.txt", [a, b, 0, 0, 0, 0, 0]))
+    for n in (100, 10_000, 200_000):
+        casos.append((f"maior_a_b a={n} b={n // 2}", macros, "maior_a_b.txt", [n, n // 2, 0, 0, 0, 0, 0]))
+        casos.append((f"menor_a_b a={n} b={n // 2}", macros, "menor_a_b.txt", [n, n // 2, 0, 0, 0, 0, 0]))
+    for n in (10, 100, 500):
+        casos.append((f"exemplomacro a={n} b={n}", macros, "exemplomacro.txt", [n, n, 0, 0, 0, 0, 0]))
+    for n_linhas in (100, 1_000, 10_000):
+        casos.append((f"linear {n_linhas} linhas", {"sintetico.txt": gerar_programa_linear(n_linhas)},
+                      "sintetico.txt", [max(1, 100_000 // n_linhas), 0]))
+    for profundidade in (10, 100, 1_000):
+        casos.append((f"cadeia de {profundidade} macros", gerar_cadeia_macros(profundidade),
+                      "cadeia0.txt", [0, 0]))
+    return casos
+
+
+def _executar(programas, arquivo, valores, limite):
+    executar(programas, BancoRegistradores(valores), arquivo)
+
+
+def _executar_com_logs(programas, arquivo, valores, limite):
+    executar_com_logs(programas, BancoRegistradores(valores), arquivo, limite_passos=limite, limite_por_macro=False)
+
+
+MOTORES_SUITE = {"executar": _executar, "executar_com_logs": _executar_com_logs}
+
+
+def medir_caso(programas, arquivo: str, valores: List[int], repeticoes: int = 3) -> List[dict]:
+    # passos e profundidade vêm de uma execução à parte; o tempo é o menor de
+    # várias repetições e a memória de pico é medida numa rodada com tracemalloc.
+    # A memo de macros é esvaziada antes de cada rodada para medir a execução, não o cache.
+    bib = obter_biblioteca(programas, len(valores))
+    ex = Execucao(bib, arquivo, list(valores))
+    ex.rodar(memoizar=False)
+    passos_logicos = ex.passos   # passos da Máquina Norma; ex.iteracoes é o trabalho feito
+    resultados = []
+    for motor, rodar in MOTORES_SUITE.items():
+        if motor == "executar_com_logs" and ex.passos > LIMITE_PASSOS_LOG:
+            continue
+        rodar(programas, arquivo, list(valores), ex.passos + 1)   # aquece caches
+        tempo = float("inf")
+        for _ in range(repeticoes):
+            bib.memo.limpar()
+            inicio = time.perf_counter()
+            rodar(programas, arquivo, list(valores), ex.passos + 1)
+            tempo = min(tempo, time.perf_counter() - inicio)
+        bib.memo.limpar()
+        tracemalloc.start()
+        rodar(programas, arquivo, list(valores), ex.passos + 1)
+        memoria = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        resultados.append({
+            "motor": motor,
+            "tempo": tempo,
+            "passos": passos_logicos,
+            "iteracoes": ex.iteracoes,
+            "passos_por_segundo": passos_logicos / tempo if tempo else None,
+            "memoria_pico": memoria,
+            "profundidade": ex.profundidade_maxima,
+        })
+    return resultados
+
+
+def rodar_suite(pasta: str = "macros", repeticoes: int = 3, filtro: Optional[str] = None) -> dict:
+    resultados = []
+    for nome, programas, arquivo, valores in casos_da_suite(pasta):
+        if filtro and filtro not in nome:
+            continue
+        for medida in medir_caso(programas, arquivo, valores, repeticoes):
+            resultados.append({"caso": nome, **medida})
+    return {
+        "versao": VERSAO_SUITE,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+
+
+def comparar_com_base(atual: dict, base: dict, tolerancia: float = 0.10, folga: float = 0.001) -> List[str]:
+    # regressão: tempo ou memória acima da base além da tolerância, ou passos diferentes;
+    # a folga (em segundos) evita acusar ruído em casos de fração de milissegundo
+    anteriores = {(r["caso"], r["motor"]): r for r in base["resultados"]}
+    avisos = []
+    for r in atual["resultados"]:
+        b = anteriores.get((r["caso"], r["motor"]))
+        if b is None:
+            continue
+        chave = f"{r['caso']} [{r['motor']}]"
+        if r["passos"] != b["passos"]:
+            avisos.append(f"{chave}: passos mudaram de {b['passos']} para {r['passos']}")
+        if r["tempo"] > b["tempo"] * (1 + tolerancia) + folga:
+            # base medida como 0 s (relógio de baixa resolução): sem percentual
+            aumento = f"+{100 * (r['tempo'] / b['tempo'] - 1):.0f}%" if b["tempo"] else "base 0 s"
+            avisos.append(f"{chave}: tempo {b['tempo']:.4f}s -> {r['tempo']:.4f}s ({aumento})")
+        if r["memoria_pico"] > b["memoria_pico"] * (1 + tolerancia) + 4096:
+            avisos.append(f"{chave}: memória {b['memoria_pico']} -> {r['memoria_pico']} bytes")
+    return avisos
+
+
+def imprimir_suite(relatorio: dict) -> None:
+    print(f"{'caso':<30} {'motor':<18} {'tempo (s)':>10} {'passos':>10} {'iterações':>10} {'passos/s':>12} "
+          f"{'memória':>10} {'prof.':>6}")
+    for r in relatorio["resultados"]:
+        # passos_por_segundo é None quando o tempo medido foi 0
+        taxa = "-" if r["passos_por_segundo"] is None else f"{r['passos_por_segundo']:.0f}"
+        print(f"{r['caso']:<30} {r['motor']:<18} {r['tempo']:>10.4f} {r['passos']:>10} {r['iteracoes']:>10} "
+              f"{taxa:>12} {r['memoria_pico']:>10} {r['profundidade']:>6}")
+
+
+def _comparar_motores_main() -> None:
+    print(f"\n{'programa':<22} {'motor':<13} {'passos':>10} {'passos/s':>12}")
+    casos = [
+        ("sintetico.txt", {"sintetico.txt": gerar_programa_linear(1_000)}, [200, 0]),
+        ("multi.txt", ler_programas("macros"), [300, 300, 0, 0, 0, 0, 0]),
+        ("pot.txt", ler_programas("macros"), [3, 5, 0, 0, 0, 0, 0]),
+    ]
+    for arquivo, programas, valores in casos:
+        for motor, (passos, taxa) in comparar_motores(programas, arquivo, valores).items():
+            print(f"{arquivo:<22} {motor:<13} {passos:>10} {taxa:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks do simulador da Máquina Norma.")
+    parser.add_argument("tamanhos", nargs="*", type=int, help="linhas dos programas sintéticos (modo escalabilidade)")
+    parser.add_argument("--suite", action="store_true", help="roda a suíte completa de casos")
+    parser.add_argument("--json", metavar="ARQUIVO", help="grava o resultado da suíte em JSON")
+    parser.add_argument("--comparar", metavar="BASE", help="compara com um JSON gravado antes; sai com 1 se regredir")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="folga relativa antes de acusar regressão")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--filtro", help="só casos cujo nome contém este texto")
+    parser.add_argument("--pasta", default="macros")
+    opcoes = parser.parse_args()
+
+    if opcoes.suite or opcoes.json or opcoes.comparar:
+        relatorio = rodar_suite(opcoes.pasta, opcoes.repeticoes, opcoes.filtro)
+        imprimir_suite(relatorio)
+        if opcoes.json:
+            with open(opcoes.json, "w", encoding="utf-8") as f:
+                json.dump(relatorio, f, indent=2)
+        if opcoes.comparar:
+            with open(opcoes.comparar, "r", encoding="utf-8") as f:
+                avisos = comparar_com_base(relatorio, json.load(f), opcoes.tolerancia)
+            for aviso in avisos:
+                print(f"REGRESSÃO: {aviso}")
+            sys.exit(1 if avisos else 0)
+    else:
+        tamanhos = opcoes.tamanhos or [100, 1_000, 10_000, 50_000]
+        print(f"{'linhas':>8} {'compilação (s)':>15} {'passos':>10} {'passos/s':>12}")
+        for n_linhas, tempo_compilacao, passos, taxa in medir_escalabilidade(tamanhos):
+            print(f"{n_linhas:>8} {tempo_compilacao:>15.4f} {passos:>10} {taxa:>12.0f}")
+        _comparar_motores_main()
@@ -0,0 +1,186 @@
+import argparse
+import json
+import sys
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from norma import BancoRegistradores, Execucao, ler_programas, obter_biblioteca, rastrear
+
+# Só o núcleo é importado no início: tkinter, numpy, o transpilador e os
+# destinos de rastro ficam para quando a opção correspondente é usada.
+
+# ============================
+# Entradas: vetores de registradores, um por linha
+# ============================
+def ler_vetores(linhas: Iterable[str]) -> Iterator[List[int]]:
+    # aceita "2 3", "2,3" e comentários com "#"; linhas vazias são ignoradas
+    for n, linha in enumerate(linhas, 1):
+        campos = linha.split("#", 1)[0].replace(",", " ").split()
+        if not campos:
+            continue
+        try:
+            yield [int(c) for c in campos]
+        except ValueError:
+            raise ValueError(f"linha {n} da entrada não é um vetor de inteiros: {linha.strip()!r}")
+
+
+def _fontes_de_entrada(opcoes) -> Iterator[List[int]]:
+    if opcoes.valores:
+        yield [int(v) for v in opcoes.valores]
+    for texto in opcoes.vetor or []:
+        yield from ler_vetores([texto])
+    if opcoes.entrada == "-":
+        yield from ler_vetores(sys.stdin)
+    elif opcoes.entrada:
+        with open(opcoes.entrada, "r", encoding="utf-8") as f:
+            yield from ler_vetores(f)
+    elif not opcoes.valores and not opcoes.vetor:
+        yield []
+
+
+# ============================
+# Execução de uma entrada (no processo principal ou num trabalhador)
+# ============================
+_contexto: Optional[Tuple[Dict[str, Dict[int, str]], argparse.Namespace]] = None
+
+
+def _inicializar(programas: Dict[str, Dict[int, str]], opcoes: argparse.Namespace) -> None:
+    global _contexto
+    _contexto = (programas, opcoes)
+
+
+def _rodar_entrada(indice: int, vetor: List[int]) -> dict:
+    programas, opcoes = _contexto
+    resultado = {"indice": indice, "entrada": vetor}
+    if len(vetor) > opcoes.n_regs:
+        resultado["erro"] = f"entrada com {len(vetor)} registradores; o limite é {opcoes.n_regs} (use --n-regs)"
+        return resultado
+    valores = vetor + [0] * (opcoes.n_regs - len(vetor))
+    bib = obter_biblioteca(programas, opcoes.n_regs)
+
+    if opcoes.rastro:
+        import rastro
+        regs = BancoRegistradores(valores)
+        caminho = opcoes.rastro.format(i=indice)
+        if opcoes.formato_rastro == "bin":
+            destino = rastro.GravadorBinario(caminho, opcoes.n_regs)
+        else:
+            destino = rastro.SinkArquivo(caminho, opcoes.formato_rastro)
+        contador = rastro.SinkContador()
+        ultimo = rastro.gravar_rastro(rastrear(programas, regs, opcoes.programa, opcoes.limite), destino, contador)
+        resultado.update(regs=regs.valores, passos=contador.estados,
+                         concluida=ultimo is None or ultimo.tipo != "ERROR", rastro=caminho)
+    elif opcoes.motor == "transpilado":
+        import transpilar
+        funcao = transpilar.transpilar(bib, opcoes.programa, not opcoes.sem_aceleracao, memoizar=not opcoes.sem_memo)
+        passos = funcao(valores, 0)
+        resultado.update(regs=valores, passos=passos, concluida=True)
+    else:
+        ex = Execucao(bib, opcoes.programa, valores)
+        ex.rodar(opcoes.limite, acelerar=not opcoes.sem_aceleracao, memoizar=not opcoes.sem_memo)
+        resultado.update(regs=ex.valores, passos=ex.passos, iteracoes=ex.iteracoes, concluida=ex.concluida)
+    return resultado
+
+
+def _rodar_bloco(bloco: List[Tuple[int, List[int]]]) -> List[dict]:
+    return [_rodar_entrada(i, vetor) for i, vetor in bloco]
+
+
+def _blocos(vetores: Iterator[List[int]], tamanho: int) -> Iterator[List[Tuple[int, List[int]]]]:
+    numerados = enumerate(vetores)
+    while True:
+        bloco = list(islice(numerados, tamanho))
+        if not bloco:
+            return
+        yield bloco
+
+
+# ============================
+# Saída JSON Lines, na ordem em que os resultados ficam prontos
+# ============================
+def executar_entradas(programas, opcoes, vetores: Iterator[List[int]], saida=sys.stdout) -> int:
+    # devolve quantas entradas terminaram com erro
+    erros = 0
+
+    def emitir(resultados: List[dict]) -> None:
+        nonlocal erros
+        for r in resultados:
+            erros += "erro" in r
+            saida.write(json.dumps(r, separators=(",", ":")) + "\n")
+        saida.flush()
+
+    if opcoes.jobs <= 1:
+        # uma entrada por vez: cada resultado sai antes da próxima linha ser lida
+        _inicializar(programas, opcoes)
+        for indice, vetor in enumerate(vetores):
+            emitir([_rodar_entrada(indice, vetor)])
+        return erros
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    with ProcessPoolExecutor(max_workers=opcoes.jobs, initializer=_inicializar,
+                             initargs=(programas, opcoes)) as pool:
+        # janela limitada: a entrada pode ser um fluxo sem fim vindo de stdin
+        pendentes = set()
+        for bloco in _blocos(vetores, opcoes.tamanho_bloco):
+            pendentes.add(pool.submit(_rodar_bloco, bloco))
+            if len(pendentes) >= 2 * opcoes.jobs:
+                prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    emitir(futuro.result())
+        for futuro in wait(pendentes).done:
+            emitir(futuro.result())
+    return erros
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Executa programas da Máquina Norma sem interface gráfica, com saída em JSON Lines.",
+    )
+    parser.add_argument("programa", help="arquivo de entrada na pasta de macros (ex.: pot ou pot.txt)")
+    parser.add_argument("valores", nargs="*", help="valores iniciais dos registradores a, b, c, ...")
+    parser.add_argument("--pasta", default="macros", help="pasta com os programas .txt")
+    parser.add_argument("--vetor", action="append", help="um vetor de registradores (pode repetir), ex.: '2 3'")
+    parser.add_argument("--entrada", help="arquivo com um vetor por linha ('-' lê de stdin, em fluxo)")
+    parser.add_argument("--n-regs", type=int, default=7, help="número de registradores (padrão: 7, a-g)")
+    parser.add_argument("--motor", choices=("interpretado", "transpilado"), default="interpretado")
+    parser.add_argument("--limite", type=int, help="limite de passos por entrada")
+    parser.add_argument("--sem-aceleracao", action="store_true", help="executa os laços passo a passo")
+    parser.add_argument("--sem-memo", action="store_true", help="não reaproveita resultados de macros")
+    parser.add_argument("--rastro", help="grava o rastro de cada entrada; use {i} para o índice da entrada")
+    parser.add_argument("--formato-rastro", choices=("jsonl", "csv", "bin"), default="jsonl")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="processos trabalhadores")
+    parser.add_argument("--tamanho-bloco", type=int, default=64, help="entradas por tarefa enviada aos trabalhadores")
+    parser.add_argument("--verificar", action="store_true", help="analisa os programas antes e para se houver erros")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = criar_parser()
+    opcoes = parser.parse_intermixed_args(argv)
+    if not opcoes.programa.endswith(".txt"):
+        opcoes.programa += ".txt"
+    if opcoes.motor == "transpilado" and (opcoes.limite is not None or opcoes.rastro):
+        parser.error("o motor transpilado não aceita --limite nem --rastro")
+    if opcoes.rastro and "{i}" not in opcoes.rastro and (opcoes.entrada or opcoes.jobs > 1 or len(opcoes.vetor or []) > 1):
+        parser.error("com várias entradas, --rastro precisa de {i} no nome do arquivo")
+
+    programas = ler_programas(opcoes.pasta)
+    if opcoes.programa not in programas:
+        parser.error(f"programa '{opcoes.programa}' não encontrado em {opcoes.pasta}")
+    if opcoes.verificar:
+        from analise import analisar
+        relatorio = analisar(programas, opcoes.n_regs)
+        for d in relatorio.erros:
+            print(d, file=sys.stderr)
+        if not relatorio.ok:
+            return 1
+
+    try:
+        erros = executar_entradas(programas, opcoes, _fontes_de_entrada(opcoes))
+    except ValueError as e:
+        print(f"erro: {e}", file=sys.stderr)
+        return 1
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
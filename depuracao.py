@@ -0,0 +1,312 @@
+import argparse
+import sys
+from bisect import bisect_right
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+from norma import BancoRegistradores, Biblioteca, Execucao, _rastrear, indice_registrador, ler_programas
+
+# ============================
+# Depuração reversa com instantâneos esparsos
+# ============================
+# A máquina é determinística: o fluxo de instruções de qualquer trecho pode ser
+# refeito a partir de um estado anterior. Por isso só um instantâneo (pilha de
+# macros, posição e registradores) é guardado a cada `intervalo` passos; para
+# voltar a um passo, restaura-se o instantâneo anterior mais próximo e a
+# execução é refeita até ele. Quando os instantâneos passam de
+# max_instantaneos, metade é descartada e o intervalo dobra, então a memória
+# fica limitada mesmo em execuções de milhões de passos. Os registradores de
+# cada instantâneo são copiados com BancoRegistradores.instantaneo para listas
+# reaproveitadas dos instantâneos descartados, e voltar a um instantâneo os
+# restaura no vetor da execução: nenhuma das duas operações aloca um vetor novo.
+INTERVALO_INSTANTANEOS = 1000
+MAX_INSTANTANEOS = 1024
+
+
+class Instantaneo(NamedTuple):
+    passos: int
+    pilha: Tuple[Tuple[int, int, int], ...]    # (programa, índice de retorno, passos na chamada)
+    pid: int
+    pc: int
+    valores: List[int]                         # não é alterada depois de capturada
+    concluida: bool
+
+
+class Momento(NamedTuple):
+    passo: int                  # linhas já executadas
+    arquivo: str                # próxima linha a executar (ou onde a execução terminou)
+    linha: int
+    regs: Tuple[int, ...]
+    concluida: bool
+
+
+class Mudanca(NamedTuple):
+    passo: int                  # o passo (linha executada) que alterou o registrador
+    arquivo: str
+    linha: int
+    antes: int
+    depois: int
+
+
+class Depurador:
+    def __init__(
+        self,
+        programas: Dict[str, Dict[int, str]],
+        arquivo: str,
+        valores: List[int],
+        intervalo: int = INTERVALO_INSTANTANEOS,
+        max_instantaneos: int = MAX_INSTANTANEOS,
+    ):
+        if arquivo not in programas:
+            raise ValueError(f"Programa '{arquivo}' não encontrado.")
+        # cópia própria dos programas e biblioteca fora do cache compartilhado: os
+        # instantâneos guardam posições no código compilado, que não pode mudar
+        # (CacheProgramas.carregar recompila as bibliotecas do cache no lugar)
+        self.programas = {nome: dict(prog) for nome, prog in programas.items()}
+        self.bib = Biblioteca(self.programas, len(valores))
+        self.arquivo = arquivo
+        self.intervalo = max(1, intervalo)
+        self.max_instantaneos = max(2, max_instantaneos)
+        self.regs = BancoRegistradores(valores)   # vetor da execução atual
+        self.ex = Execucao(self.bib, arquivo, self.regs.valores)
+        self._livres: List[List[int]] = []      # vetores dos instantâneos descartados
+        self._trabalho: List[int] = []          # vetor usado ao refazer trechos
+        self.instantaneos: List[Instantaneo] = [self._capturar(self.ex)]
+        self._passos_instantaneos: List[int] = [0]
+        self.fronteira = 0      # maior passo já alcançado; até ele os instantâneos estão completos
+
+    # ============================
+    # Instantâneos
+    # ============================
+    def _capturar(self, ex: Execucao) -> Instantaneo:
+        pilha = tuple((pid, pc, inicio) for pid, pc, _, inicio in ex.pilha)
+        valores = self.regs.instantaneo(self._livres.pop() if self._livres else None)
+        return Instantaneo(ex.passos, pilha, ex.pid, ex.pc, valores, ex.concluida)
+
+    def _restaurar(self, inst: Instantaneo) -> Execucao:
+        self.regs.restaurar(inst.valores)
+        ex = Execucao(self.bib, self.arquivo, self.regs.valores)
+        # sem chave na memo: o resultado de uma chamada restaurada não é guardado
+        ex.pilha = [(pid, pc, None, inicio) for pid, pc, inicio in inst.pilha]
+        ex.pid, ex.pc, ex.passos, ex.concluida = inst.pid, inst.pc, inst.passos, inst.concluida
+        ex.profundidade_maxima = len(ex.pilha)
+        return ex
+
+    def _guardar(self, inst: Instantaneo) -> None:
+        self.instantaneos.append(inst)
+        self._passos_instantaneos.append(inst.passos)
+        if len(self.instantaneos) > self.max_instantaneos:
+            # fica com os múltiplos do novo intervalo (o passo 0 sempre fica)
+            self.intervalo *= 2
+            mantidos = []
+            for i in self.instantaneos:
+                if i.passos % self.intervalo == 0:
+                    mantidos.append(i)
+                else:
+                    self._livres.append(i.valores)
+            self.instantaneos = mantidos
+            self._passos_instantaneos = [i.passos for i in self.instantaneos]
+
+    def _instantaneo_ate(self, passo: int) -> Instantaneo:
+        # o último instantâneo com passos <= passo
+        return self.instantaneos[bisect_right(self._passos_instantaneos, passo) - 1]
+
+    def _executar_ate(self, ex: Execucao, alvo: Optional[int]) -> None:
+        # avança ex até o passo alvo (None: até terminar), guardando instantâneos além da fronteira
+        while not ex.concluida and (alvo is None or ex.passos < alvo):
+            proximo = (ex.passos // self.intervalo + 1) * self.intervalo
+            ex.rodar(proximo - ex.passos if alvo is None else min(proximo, alvo) - ex.passos)
+            if ex.passos > self.fronteira:
+                self.fronteira = ex.passos
+                if ex.passos % self.intervalo == 0 and not ex.concluida:
+                    self._guardar(self._capturar(ex))
+
+    def _repassar(self, inicio: int, fim: int) -> Iterator[Momento]:
+        # refaz linha a linha os passos de inicio (um instantâneo) até fim
+        inst = self._instantaneo_ate(inicio)
+        if inst.concluida:
+            yield Momento(inst.passos, *self._local(inst.pid, inst.pc), tuple(inst.valores), True)
+            return
+        valores = self._trabalho
+        valores[:] = inst.valores
+        pilha = [(pid, pc) for pid, pc, _ in inst.pilha]
+        passo = inst.passos
+        ultimo = self._local(inst.pid, inst.pc)
+        for p in _rastrear(self.bib, inst.pid, valores, fim - passo + 1, pilha, inst.pc):
+            if p.tipo == "ERROR":
+                return
+            if p.tipo == "STATE":
+                yield Momento(passo, p.arquivo, p.linha, p.regs, False)
+                passo += 1
+            ultimo = (p.arquivo, p.linha)
+        if passo <= fim:
+            yield Momento(passo, *ultimo, tuple(valores), True)
+
+    def _segmentos(self, fim: int) -> Iterator[Tuple[int, int]]:
+        # trechos entre instantâneos, do mais recente para o mais antigo, até o passo fim
+        i = bisect_right(self._passos_instantaneos, fim) - 1
+        while i >= 0:
+            inicio = self._passos_instantaneos[i]
+            yield inicio, fim
+            fim = inicio
+            i -= 1
+
+    def _local(self, pid: int, pc: int) -> Tuple[str, int]:
+        cp = self.bib.compilados[pid]
+        return cp.arquivo, cp.linhas[pc] if cp.linhas else 0
+
+    # ============================
+    # Navegação
+    # ============================
+    @property
+    def passo(self) -> int:
+        return self.ex.passos
+
+    def posicao(self) -> Momento:
+        ex = self.ex
+        return Momento(ex.passos, *self._local(ex.pid, ex.pc), tuple(ex.valores), ex.concluida)
+
+    def ir_para(self, passo: int) -> Momento:
+        # além do fim da execução, para no fim
+        passo = max(0, passo)
+        if passo < self.ex.passos:
+            self.ex = self._restaurar(self._instantaneo_ate(passo))
+        self._executar_ate(self.ex, passo)
+        return self.posicao()
+
+    def avancar(self, n: int = 1) -> Momento:
+        return self.ir_para(self.ex.passos + n)
+
+    def voltar(self, n: int = 1) -> Momento:
+        return self.ir_para(self.ex.passos - n)
+
+    def continuar(self, limite_passos: Optional[int] = None) -> Momento:
+        self._executar_ate(self.ex, None if limite_passos is None else self.ex.passos + limite_passos)
+        return self.posicao()
+
+    # ============================
+    # Consultas para trás
+    # ============================
+    def voltar_ate_linha(self, arquivo: str, linha: int) -> Optional[Momento]:
+        # última vez, antes do passo atual, em que a linha estava para ser executada;
+        # sem ocorrência, a posição não muda e o retorno é None
+        if arquivo not in self.bib.programas:
+            raise ValueError(f"Programa '{arquivo}' não encontrado.")
+        pid = self.bib.id_de(arquivo)
+        cp = self.bib.compilados[pid]
+        if linha not in cp.inicio:
+            raise ValueError(f"{arquivo} não tem a linha {linha}.")
+        for inicio, fim in self._segmentos(self.ex.passos - 1):
+            encontrado = None
+            for m in self._repassar(inicio, fim):
+                if m.linha == linha and m.arquivo == arquivo and not m.concluida:
+                    encontrado = m.passo
+            if encontrado is not None:
+                return self.ir_para(encontrado)
+        return None
+
+    def ultima_mudanca(self, registrador: Union[str, int]) -> Optional[Mudanca]:
+        # último passo, até o atual, que alterou o registrador (não move a posição)
+        r = registrador if isinstance(registrador, int) else indice_registrador(registrador, self.bib.n_regs)
+        if not 0 <= r < self.bib.n_regs:
+            raise ValueError(f"Registrador inválido: {registrador}")
+        _, escrita = self.bib.registradores()
+        if r not in escrita[self.bib.id_de(self.arquivo)]:
+            return None
+        for inicio, fim in self._segmentos(self.ex.passos):
+            anterior = None
+            encontrada = None
+            for m in self._repassar(inicio, fim):
+                if anterior is not None and m.regs[r] != anterior.regs[r]:
+                    encontrada = Mudanca(m.passo, anterior.arquivo, anterior.linha, anterior.regs[r], m.regs[r])
+                anterior = m
+            if encontrada is not None:
+                return encontrada
+        return None
+
+
+# ============================
+# Uso sem interface gráfica: comandos lidos da entrada padrão
+# ============================
+AJUDA = """comandos:
+  a [n]            avança n passos (padrão 1)
+  v [n]            volta n passos (padrão 1)
+  ir N             vai para o passo N
+  c [limite]       continua até o fim (ou por até limite passos)
+  vl [arq:]linha   volta até a última vez em que a linha ia ser executada
+  m reg            último passo que alterou o registrador (ex.: m a)
+  p                mostra a posição atual
+  q                sai"""
+
+
+def formatar_momento(m: Momento, programas: Dict[str, Dict[int, str]]) -> str:
+    regs = ", ".join(f"{chr(ord('a') + i)}={v}" for i, v in enumerate(m.regs))
+    if m.concluida:
+        return f"passo {m.passo}: fim da execução | Regs: [{regs}]"
+    instrucao = programas.get(m.arquivo, {}).get(m.linha, "")
+    return f"passo {m.passo}: [{m.arquivo}:{m.linha}] -> {instrucao} | Regs: [{regs}]"
+
+
+def executar_comando(dep: Depurador, comando: str, programas: Dict[str, Dict[int, str]]) -> Optional[str]:
+    # devolve o texto a mostrar; None encerra a sessão
+    partes = comando.split()
+    if not partes:
+        return ""
+    nome, argumentos = partes[0], partes[1:]
+    if nome == "q":
+        return None
+    if nome == "a":
+        return formatar_momento(dep.avancar(int(argumentos[0]) if argumentos else 1), programas)
+    if nome == "v":
+        return formatar_momento(dep.voltar(int(argumentos[0]) if argumentos else 1), programas)
+    if nome == "ir" and argumentos:
+        return formatar_momento(dep.ir_para(int(argumentos[0])), programas)
+    if nome == "c":
+        return formatar_momento(dep.continuar(int(argumentos[0]) if argumentos else None), programas)
+    if nome == "vl" and argumentos:
+        arquivo, _, linha = argumentos[0].rpartition(":")
+        momento = dep.voltar_ate_linha(arquivo or dep.posicao().arquivo, int(linha))
+        return formatar_momento(momento, programas) if momento else "a linha não foi executada antes deste passo"
+    if nome == "m" and argumentos:
+        mudanca = dep.ultima_mudanca(argumentos[0])
+        if mudanca is None:
+            return f"{argumentos[0]} não mudou até o passo {dep.passo}"
+        return (f"{argumentos[0]}: {mudanca.antes} -> {mudanca.depois} no passo {mudanca.passo} "
+                f"[{mudanca.arquivo}:{mudanca.linha}]")
+    if nome == "p":
+        return formatar_momento(dep.posicao(), programas)
+    return AJUDA
+
+
+if __name__ == "__main__":
+    # uso: python depuracao.py pot 3 4; os comandos podem vir de um pipe (printf "c\nv 5\n" | ...)
+    parser = argparse.ArgumentParser(description="Depurador com volta no tempo para a Máquina Norma.")
+    parser.add_argument("arquivo")
+    parser.add_argument("valores", nargs="*", type=int)
+    parser.add_argument("--regs", type=int, default=7)
+    parser.add_argument("--pasta", default="macros")
+    parser.add_argument("--intervalo", type=int, default=INTERVALO_INSTANTANEOS, help="passos entre instantâneos")
+    parser.add_argument("--instantaneos", type=int, default=MAX_INSTANTANEOS, help="máximo de instantâneos guardados")
+    opcoes = parser.parse_intermixed_args()
+
+    arquivo = opcoes.arquivo if opcoes.arquivo.endswith(".txt") else opcoes.arquivo + ".txt"
+    programas = ler_programas(opcoes.pasta)
+    valores = opcoes.valores + [0] * (opcoes.regs - len(opcoes.valores))
+    try:
+        dep = Depurador(programas, arquivo, valores, opcoes.intervalo, opcoes.instantaneos)
+    except ValueError as e:
+        sys.exit(f"erro: {e}")
+    interativo = sys.stdin.isatty()
+    print(formatar_momento(dep.posicao(), programas))
+    while True:
+        if interativo:
+            print("(norma) ", end="", flush=True)
+        comando = sys.stdin.readline()
+        if not comando:
+            break
+        try:
+            saida = executar_comando(dep, comando, programas)
+        except ValueError as e:
+            saida = f"erro: {e}"
+        if saida is None:
+            break
+        if saida:
+            print(saida)
@@ -0,0 +1,133 @@
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from norma import Biblioteca, Execucao
+
+# ============================
+# Resultado compacto de um lote
+# ============================
+class ResultadoLote:
+    __slots__ = ("n_regs", "valores", "passos", "concluidos")
+
+    def __init__(self, n_regs: int):
+        self.n_regs = n_regs
+        self.valores = array("q")      # registradores finais, linha a linha (N * R)
+        self.passos = array("q")       # passos executados por entrada
+        self.concluidos = array("b")   # 1 = terminou, 0 = estourou o limite de passos
+
+    def estender(self, valores, passos, concluidos) -> None:
+        self.valores = _estender(self.valores, valores)
+        self.passos = _estender(self.passos, passos)
+        self.concluidos.extend(concluidos)
+
+    def __len__(self) -> int:
+        return len(self.concluidos)
+
+    def linha(self, i: int) -> Tuple[int, ...]:
+        return tuple(self.valores[i * self.n_regs:(i + 1) * self.n_regs])
+
+    def __iter__(self) -> Iterator[Tuple[int, ...]]:
+        return (self.linha(i) for i in range(len(self)))
+
+    def __repr__(self) -> str:
+        return f"ResultadoLote(entradas={len(self)}, n_regs={self.n_regs})"
+
+
+def _compactar(numeros: List[int]):
+    try:
+        return array("q", numeros)
+    except OverflowError:
+        return numeros
+
+
+def _estender(destino, numeros):
+    if isinstance(destino, array) and not isinstance(numeros, array):
+        # números maiores que 64 bits: cai para uma lista de inteiros do Python
+        destino = list(destino)
+    destino.extend(numeros)
+    return destino
+
+
+# ============================
+# Execução de um bloco de entradas (roda dentro de cada processo)
+# ============================
+_contexto: Tuple[Biblioteca, str, Optional[int], bool] = None
+
+
+def _inicializar(bib: Biblioteca, arquivo: str, limite_passos: Optional[int], acelerar: bool) -> None:
+    global _contexto
+    _contexto = (bib, arquivo, limite_passos, acelerar)
+
+
+def _rodar_bloco(bloco: List[List[int]]):
+    bib, arquivo, limite_passos, acelerar = _contexto
+    valores: List[int] = []
+    passos: List[int] = []
+    concluidos = array("b")
+    for entrada in bloco:
+        ex = Execucao(bib, arquivo, entrada)
+        concluidos.append(ex.rodar(limite_passos, acelerar=acelerar))
+        passos.append(ex.passos)
+        valores.extend(ex.valores)
+    return _compactar(valores), _compactar(passos), concluidos
+
+
+def _blocos(entradas: Iterable[Sequence[int]], n_regs: int, tamanho_bloco: int) -> Iterator[List[List[int]]]:
+    it = iter(entradas)
+    while True:
+        bloco = []
+        for entrada in islice(it, tamanho_bloco):
+            vetor = [int(v) for v in entrada]
+            if len(vetor) > n_regs:
+                raise ValueError(f"Entrada com {len(vetor)} registradores; o lote usa {n_regs}.")
+            vetor.extend([0] * (n_regs - len(vetor)))
+            bloco.append(vetor)
+        if not bloco:
+            return
+        yield bloco
+
+
+# ============================
+# API de lote: um programa sobre muitos vetores de registradores
+# ============================
+def executar_lote(
+    programas: Dict[str, Dict[int, str]],
+    arquivo: str,
+    entradas: Iterable[Sequence[int]],
+    n_regs: int = 7,
+    trabalhadores: Optional[int] = None,
+    tamanho_bloco: int = 256,
+    limite_passos: Optional[int] = None,
+    acelerar: bool = True,
+) -> ResultadoLote:
+    # compila uma única vez; cada processo recebe a biblioteca já compilada
+    bib = Biblioteca(programas, n_regs)
+    bib.id_de(arquivo)
+    if trabalhadores is None:
+        trabalhadores = os.cpu_count() or 1
+
+    resultado = ResultadoLote(n_regs)
+    blocos = _blocos(entradas, n_regs, tamanho_bloco)
+    if trabalhadores <= 1:
+        _inicializar(bib, arquivo, limite_passos, acelerar)
+        for bloco in blocos:
+            resultado.estender(*_rodar_bloco(bloco))
+        return resultado
+
+    with ProcessPoolExecutor(
+        max_workers=trabalhadores,
+        initializer=_inicializar,
+        initargs=(bib, arquivo, limite_passos, acelerar),
+    ) as pool:
+        # janela limitada de blocos em voo: a entrada pode ser um gerador enorme
+        pendentes = deque()
+        for bloco in blocos:
+            pendentes.append(pool.submit(_rodar_bloco, bloco))
+            if len(pendentes) >= 2 * trabalhadores:
+                resultado.estender(*pendentes.popleft().result())
+        while pendentes:
+            resultado.estender(*pendentes.popleft().result())
+    return resultado
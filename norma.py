@@ -1,12 +1,35 @@
+import hashlib
 import os
-from typing import Dict, List, Tuple 
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
 # ============================
 # Registrador
 # ============================
 class Registrador:
+    # visão de uma posição de um vetor de valores (próprio ou de um BancoRegistradores)
+    __slots__ = ("nome", "_valores", "_indice")
+
     def __init__(self, nome: str, valor_inicial: int = 0):
         self.nome = nome
-        self.valor = valor_inicial
+        self._valores = [valor_inicial]
+        self._indice = 0
+
+    @classmethod
+    def visao(cls, nome: str, valores: List[int], indice: int) -> "Registrador":
+        reg = cls.__new__(cls)
+        reg.nome = nome
+        reg._valores = valores
+        reg._indice = indice
+        return reg
+
+    @property
+    def valor(self) -> int:
+        return self._valores[self._indice]
+
+    @valor.setter
+    def valor(self, novo: int) -> None:
+        self._valores[self._indice] = novo
 
     def inc(self) -> None:
         self.valor += 1
@@ -18,13 +41,109 @@ class Registrador:
     def zero(self) -> bool:
         return self.valor == 0
 
+    # operações em bloco: equivalem a n inc()/dec() seguidos, em tempo constante
+    def somar(self, n: int) -> None:
+        self.valor += n
+
+    def subtrair(self, n: int) -> None:
+        v = self.valor - n
+        self.valor = v if v > 0 else 0
+
+    def zerar(self) -> int:
+        v = self.valor
+        self.valor = 0
+        return v
+
+    def transferir(self, *destinos: "Registrador", fator: int = 1) -> None:
+        # esvazia este registrador somando fator * valor em cada destino
+        k = self.zerar() * fator
+        for destino in destinos:
+            destino.somar(k)
+
     def __repr__(self) -> str:
         return f"{self.nome}={self.valor}"
 
 
+# ============================
+# Banco de registradores: vetor de inteiros de tamanho fixo
+# ============================
+class BancoRegistradores:
+    __slots__ = ("nomes", "valores")
+
+    def __init__(self, valores: Sequence[int] = (), n_regs: Optional[int] = None):
+        if n_regs is None:
+            n_regs = len(valores)
+        if len(valores) > n_regs:
+            raise ValueError(f"{len(valores)} valores para {n_regs} registradores.")
+        self.nomes = [chr(ord("a") + i) for i in range(n_regs)]
+        self.valores = [int(v) for v in valores] + [0] * (n_regs - len(valores))
+
+    @classmethod
+    def de_registradores(cls, regs: Sequence[Registrador]) -> "BancoRegistradores":
+        banco = cls([r.valor for r in regs])
+        banco.nomes = [r.nome for r in regs]
+        return banco
+
+    def indice(self, nome: str) -> int:
+        return self.nomes.index(nome)
+
+    def instantaneo(self, destino: Optional[List[int]] = None) -> List[int]:
+        # copia os valores para "destino" sem alocar uma nova lista
+        if destino is None:
+            return list(self.valores)
+        destino[:] = self.valores
+        return destino
+
+    def restaurar(self, origem: Sequence[int]) -> None:
+        self.valores[:] = origem
+
+    def __len__(self) -> int:
+        return len(self.valores)
+
+    def __getitem__(self, i: int) -> Registrador:
+        if i < 0:
+            i += len(self.valores)
+        if not 0 <= i < len(self.valores):
+            raise IndexError("registrador fora do banco")
+        return Registrador.visao(self.nomes[i], self.valores, i)
+
+    def __iter__(self) -> Iterator[Registrador]:
+        return (Registrador.visao(n, self.valores, i) for i, n in enumerate(self.nomes))
+
+    def __repr__(self) -> str:
+        return "[" + ", ".join(f"{n}={v}" for n, v in zip(self.nomes, self.valores)) + "]"
+
+
+Registradores = Union[List[Registrador], BancoRegistradores]
+
+
+def _abrir_registradores(regs: Registradores) -> List[int]:
+    # o banco é usado diretamente; listas de Registrador são copiadas e devolvidas no fim
+    if isinstance(regs, BancoRegistradores):
+        return regs.valores
+    return [r.valor for r in regs]
+
+
+def _devolver_registradores(regs: Registradores, valores: List[int]) -> None:
+    if not isinstance(regs, BancoRegistradores):
+        for reg, valor in zip(regs, valores):
+            reg.valor = valor
+
+
 # ========================================
 # Leitura dos "programas" (arquivos .txt)
 # ========================================
+def interpretar_programa(texto: str) -> Dict[int, str]:
+    mapa: Dict[int, str] = {}
+    for linha in texto.splitlines():
+        linha = linha.strip()
+        if not linha or ":" not in linha:
+            continue
+        num, texto_linha = linha.split(":", 1)
+        mapa[int(num.strip())] = texto_linha.strip()
+    return mapa
+
+
 def ler_programas(pasta: str = "macros") -> Dict[str, Dict[int, str]]:
     programas: Dict[str, Dict[int, str]] = {}
     for arquivo in os.listdir(pasta):
@@ -32,17 +151,59 @@ def ler_programas(pasta: str = "macros") -> Dict[str, Dict[int, str]]:
             continue
         caminho = os.path.join(pasta, arquivo)
         with open(caminho, "r", encoding="utf-8") as f:
-            mapa: Dict[int, str] = {}
-            for linha in f:
-                linha = linha.strip()
-                if not linha or ":" not in linha:
-                    continue
-                num, texto = linha.split(":", 1)
-                mapa[int(num.strip())] = texto.strip()
-            programas[arquivo] = mapa
+            programas[arquivo] = interpretar_programa(f.read())
     return programas
 
 
+# ========================================
+# Cache de programas: relê só os arquivos que mudaram
+# ========================================
+class CacheProgramas:
+    def __init__(self, pasta: str = "macros"):
+        self.pasta = pasta
+        self.programas: Dict[str, Dict[int, str]] = {}   # o mesmo dict a cada carga
+        self._assinaturas: Dict[str, Tuple[int, int, str]] = {}  # (mtime_ns, tamanho, sha1)
+        self.alterados: List[str] = []   # arquivos que mudaram na última carga
+
+    def carregar(self) -> Dict[str, Dict[int, str]]:
+        alterados: List[str] = []
+        vistos = set()
+        try:
+            with os.scandir(self.pasta) as entradas:
+                for entrada in entradas:
+                    if not entrada.name.endswith(".txt") or not entrada.is_file():
+                        continue
+                    arquivo = entrada.name
+                    vistos.add(arquivo)
+                    st = entrada.stat()
+                    anterior = self._assinaturas.get(arquivo)
+                    if anterior is not None and anterior[:2] == (st.st_mtime_ns, st.st_size):
+                        continue
+                    with open(entrada.path, "rb") as f:
+                        dados = f.read()
+                    resumo = hashlib.sha1(dados).hexdigest()
+                    if anterior is None or anterior[2] != resumo:
+                        # a assinatura só é guardada depois de interpretar: um arquivo
+                        # inválido continua dando erro em todas as cargas
+                        self.programas[arquivo] = interpretar_programa(dados.decode("utf-8"))
+                        alterados.append(arquivo)
+                    self._assinaturas[arquivo] = (st.st_mtime_ns, st.st_size, resumo)
+
+            for arquivo in [a for a in self.programas if a not in vistos]:
+                del self.programas[arquivo]
+                self._assinaturas.pop(arquivo, None)
+                alterados.append(arquivo)
+        finally:
+            # descarta as formas compiladas dos alterados e de quem os chama,
+            # mesmo que outro arquivo tenha falhado depois deles
+            if alterados:
+                for bib in list(_cache_bibliotecas.values()):
+                    if bib.programas is self.programas:
+                        bib.invalidar(alterados)
+            self.alterados = alterados
+        return self.programas
+
+
 # ==========================================
 # Parser: quebra uma linha em "blocos" (tokens)
 # ==========================================
@@ -73,192 +234,909 @@ def quebrar_em_blocos(texto: str) -> List[str]:
             blocos.append(w); i += 1
     return blocos
 
-# ======================================
-# Execução: interpreta um arquivo .txt
-# ======================================
-def executar(
+
+# ==========================================
+# Compilação: pré-decodifica um programa em instruções
+# ==========================================
+OP_ADD = 0
+OP_SUB = 1
+OP_SE = 2
+OP_VA = 3
+OP_MACRO = 4
+OP_FIM = 5
+OP_ABORTA = 6
+OP_LACO = 7  # "se zero_" no topo de um laço de contagem acelerado
+
+
+class ProgramaCompilado:
+    __slots__ = (
+        "arquivo", "ops", "args", "alvos", "linhas",
+        "inicio", "sucessor", "saltos_invalidos", "motivos", "ignorados",
+        "macros", "macros_ausentes", "ops_otimizados", "lacos",
+    )
+
+    def __init__(self, arquivo: str):
+        self.arquivo = arquivo
+        self.ops: List[int] = []      # opcode de cada instrução
+        self.args: List[int] = []     # índice do registrador (ou da macro)
+        self.alvos: List[int] = []    # destino do salto, já resolvido como índice
+        self.linhas: List[int] = []   # linha de origem de cada instrução
+        self.inicio: Dict[int, int] = {}  # linha -> índice da primeira instrução
+        self.sucessor: Dict[int, Optional[int]] = {}  # linha -> próxima linha
+        self.saltos_invalidos: List[Tuple[int, int]] = []  # (linha, destino)
+        self.motivos: Dict[int, str] = {}  # índice do OP_ABORTA -> motivo (exceto saltos inválidos)
+        self.ignorados: List[Tuple[int, str]] = []  # (linha, bloco desconhecido)
+        self.macros: List[str] = []
+        self.macros_ausentes: List[str] = []  # m_ para arquivos que não existem
+        self.ops_otimizados: List[int] = self.ops  # ops com os laços acelerados
+        self.lacos: Dict[int, "Laco"] = {}  # índice do "se zero_" -> laço
+
+    def abortar(self, linha: int, motivo: str) -> None:
+        self.motivos[self.emitir(OP_ABORTA, linha)] = motivo
+
+    def emitir(self, op: int, linha: int, arg: int = 0, alvo: int = 0) -> int:
+        self.ops.append(op)
+        self.args.append(arg)
+        self.alvos.append(alvo)
+        self.linhas.append(linha)
+        return len(self.ops) - 1
+
+
+def indice_registrador(nome: str, n_regs: int) -> int:
+    if len(nome) != 1:
+        return -1
+    idx = ord(nome) - ord("a")
+    return idx if 0 <= idx < n_regs else -1
+
+
+def _registrador_invalido(nome: str, n_regs: int) -> str:
+    disponiveis = f"a-{chr(ord('a') + n_regs - 1)}" if n_regs > 1 else "a"
+    return f"registrador '{nome}' inválido (disponíveis: {disponiveis})"
+
+
+def nome_da_macro(bloco: str) -> str:
+    nome_macro = bloco[2:]
+    if not nome_macro.endswith(".txt"):
+        nome_macro += ".txt"
+    return nome_macro
+
+
+def _emitir_blocos(
+    cp: ProgramaCompilado,
+    blocos: List[str],
+    linha: int,
+    proxima,
     programas: Dict[str, Dict[int, str]],
-    regs: List[Registrador],          
-    arquivo: str = "main.txt",
-    log: bool = False,  
+    n_regs: int,
+    saltos: List[Tuple[int, int]],
 ) -> None:
+    i = 0
+    while i < len(blocos):
+        b = blocos[i]
+        if b.startswith("faca "):
+            b = b.split(" ", 1)[1]
+
+        if b.startswith("se zero_"):
+            nome = b.split("zero_", 1)[1]
+            idx = indice_registrador(nome, n_regs)
+            try:
+                idx_senao = blocos.index("senao", i + 1)
+            except ValueError:
+                cp.abortar(linha, f"'{b}' sem 'senao'")
+                return
+            if idx < 0:
+                cp.abortar(linha, _registrador_invalido(nome, n_regs))
+                return
+            ini_true = i + 1
+            if ini_true < len(blocos) and blocos[ini_true] == "entao":
+                ini_true += 1
+            pc_se = cp.emitir(OP_SE, linha, idx)
+            _emitir_blocos(cp, blocos[ini_true:idx_senao], linha, proxima, programas, n_regs, saltos)
+            cp.alvos[pc_se] = len(cp.ops)
+            _emitir_blocos(cp, blocos[idx_senao + 1:], linha, proxima, programas, n_regs, saltos)
+            return
+
+        if b.startswith("va_para"):
+            partes = b.split()
+            if len(partes) != 2 or not partes[1].isdigit():
+                cp.abortar(linha, f"'{b}' sem um número de linha")
+                return
+            saltos.append((cp.emitir(OP_VA, linha), int(partes[1])))
+            return
+
+        if b.startswith("add_") or b.startswith("sub_"):
+            idx = indice_registrador(b[4:], n_regs)
+            if idx < 0:
+                cp.abortar(linha, _registrador_invalido(b[4:], n_regs))
+                return
+            cp.emitir(OP_ADD if b[0] == "a" else OP_SUB, linha, idx)
+            i += 1
+            continue
+
+        if b.startswith("m_"):
+            nome_macro = nome_da_macro(b)
+            if nome_macro not in programas:
+                cp.macros_ausentes.append(nome_macro)
+                cp.abortar(linha, f"macro '{nome_macro}' não encontrada")
+                return
+            if nome_macro not in cp.macros:
+                cp.macros.append(nome_macro)
+            cp.emitir(OP_MACRO, linha, cp.macros.index(nome_macro))
+            i += 1
+            continue
+
+        cp.ignorados.append((linha, b))  # bloco desconhecido: ignorado
+        i += 1
+
+    if proxima is None:
+        cp.emitir(OP_FIM, linha)
+    else:
+        saltos.append((cp.emitir(OP_VA, linha), proxima))
+
+
+def tabela_de_sucessores(linhas: List[int]) -> Dict[int, Optional[int]]:
+    sucessor: Dict[int, Optional[int]] = dict(zip(linhas, linhas[1:]))
+    if linhas:
+        sucessor[linhas[-1]] = None
+    return sucessor
+
+
+def compilar_programa(
+    programas: Dict[str, Dict[int, str]],
+    arquivo: str,
+    n_regs: int,
+) -> ProgramaCompilado:
+    cp = ProgramaCompilado(arquivo)
     prog = programas.get(arquivo)
     if not prog:
-        return
+        cp.abortar(0, "programa vazio ou inexistente")
+        return cp
 
-    blocos_por_linha = {ln: quebrar_em_blocos(txt) for ln, txt in prog.items()}
-    linhas = sorted(blocos_por_linha) 
-    if not linhas:
-        return
+    cp.sucessor = tabela_de_sucessores(sorted(prog))
+    saltos: List[Tuple[int, int]] = []
+    for ln, proxima in cp.sucessor.items():
+        cp.inicio[ln] = len(cp.ops)
+        _emitir_blocos(cp, quebrar_em_blocos(prog[ln]), ln, proxima, programas, n_regs, saltos)
 
-    def prox_linha(ln: int):
-        try:
-            i = linhas.index(ln)
-            return linhas[i + 1]
-        except (ValueError, IndexError):
+    # resolve todos os va_para (e as passagens para a linha seguinte) uma única vez
+    for pc, destino in saltos:
+        if destino in cp.inicio:
+            cp.alvos[pc] = cp.inicio[destino]
+        else:
+            cp.ops[pc] = OP_ABORTA
+            cp.saltos_invalidos.append((cp.linhas[pc], destino))
+
+    acelerar_lacos(cp)
+    return cp
+
+# ==========================================
+# Otimização: aceleração algébrica de laços de contagem
+# ==========================================
+LIMITE_CORPO_LACO = 256
+
+
+class Laco:
+    __slots__ = ("contador", "incrementos", "decrementos", "passos", "entradas")
+
+    def __init__(
+        self,
+        contador: int,
+        incrementos: List[Tuple[int, int]],
+        decrementos: List[Tuple[int, int]],
+        passos: int,
+        entradas: Tuple[int, ...] = (),
+    ):
+        self.contador = contador
+        self.incrementos = incrementos  # (registrador, add_ por iteração)
+        self.decrementos = decrementos  # (registrador, sub_ por iteração)
+        self.passos = passos            # linhas executadas por iteração
+        self.entradas = entradas        # início (pc) de cada linha executada por iteração
+
+    @property
+    def tipo(self) -> str:
+        # zerar: só esvazia o contador; transferir: soma o contador em outros
+        # registradores; somar: com múltiplos; subtrair: também desconta de outros
+        if self.decrementos:
+            return "subtrair"
+        if not self.incrementos:
+            return "zerar"
+        return "transferir" if all(c == 1 for _, c in self.incrementos) else "somar"
+
+    def aplicar(self, valores: List[int], k: int) -> None:
+        # executa k voltas do laço de uma vez (k <= valor do contador)
+        valores[self.contador] -= k
+        for r, c in self.incrementos:
+            valores[r] += k * c
+        for r, c in self.decrementos:
+            v = valores[r] - k * c
+            valores[r] = v if v > 0 else 0
+
+
+def detectar_laco(cp: ProgramaCompilado, pc_se: int) -> Optional[Laco]:
+    # segue o ramo "senao" do teste até voltar a ele; o corpo só pode
+    # ter add_/sub_ e saltos, e o contador deve cair exatamente 1 por volta
+    contador = cp.args[pc_se]
+    somas: Dict[int, int] = {}
+    subtracoes: Dict[int, int] = {}
+    entradas: List[int] = []
+    visitados = set()
+    pc = cp.alvos[pc_se]
+    while pc != pc_se:
+        if pc in visitados or len(visitados) > LIMITE_CORPO_LACO:
+            return None
+        visitados.add(pc)
+        op = cp.ops[pc]
+        if op == OP_ADD:
+            somas[cp.args[pc]] = somas.get(cp.args[pc], 0) + 1
+            pc += 1
+        elif op == OP_SUB:
+            subtracoes[cp.args[pc]] = subtracoes.get(cp.args[pc], 0) + 1
+            pc += 1
+        elif op == OP_VA:
+            pc = cp.alvos[pc]
+            entradas.append(pc)
+        else:
+            return None
+
+    if subtracoes.pop(contador, 0) != 1 or contador in somas:
+        return None
+    if any(r in somas for r in subtracoes):
+        return None
+    return Laco(contador, sorted(somas.items()), sorted(subtracoes.items()), len(entradas), tuple(entradas))
+
+
+def acelerar_lacos(cp: ProgramaCompilado) -> None:
+    for pc, op in enumerate(cp.ops):
+        if op == OP_SE:
+            laco = detectar_laco(cp, pc)
+            if laco is not None:
+                cp.lacos[pc] = laco
+    if cp.lacos:
+        cp.ops_otimizados = list(cp.ops)
+        for pc in cp.lacos:
+            cp.ops_otimizados[pc] = OP_LACO
+
+# ==========================================
+# Memoização de macros: (macro, entradas) -> (saídas, passos)
+# ==========================================
+TAMANHO_MEMO = 4096
+
+
+class MemoMacros:
+    # LRU limitado; uma macro só depende dos registradores que lê, então o
+    # resultado de uma chamada vale para qualquer outra com as mesmas entradas
+    __slots__ = ("capacidade", "dados", "acertos", "falhas")
+
+    def __init__(self, capacidade: int = TAMANHO_MEMO):
+        self.capacidade = capacidade
+        self.dados: "OrderedDict[tuple, Tuple[Tuple[int, ...], int]]" = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+
+    def buscar(self, chave: tuple, folga) -> Optional[Tuple[Tuple[int, ...], int]]:
+        # só vale como acerto se a chamada inteira cabe no que resta do limite de passos
+        salvo = self.dados.get(chave)
+        if salvo is None or salvo[1] > folga:
+            self.falhas += 1
             return None
+        self.dados.move_to_end(chave)
+        self.acertos += 1
+        return salvo
+
+    def guardar(self, chave: tuple, saidas: Tuple[int, ...], passos: int) -> None:
+        self.dados[chave] = (saidas, passos)
+        self.dados.move_to_end(chave)
+        while len(self.dados) > self.capacidade:
+            self.dados.popitem(last=False)
+
+    def limpar(self) -> None:
+        self.dados.clear()
+        self.acertos = self.falhas = 0
+
+    def __len__(self) -> int:
+        return len(self.dados)
+
+    def __repr__(self) -> str:
+        return f"MemoMacros(entradas={len(self.dados)}, acertos={self.acertos}, falhas={self.falhas})"
+
+
+def registradores_por_programa(bib: "Biblioteca") -> Tuple[List[Tuple[int, ...]], List[Tuple[int, ...]]]:
+    # registradores lidos (testados ou alterados) e escritos por cada programa,
+    # incluindo as macros que ele chama, direta ou indiretamente
+    leitura: List[set] = []
+    escrita: List[set] = []
+    for cp in bib.compilados:
+        le, es = set(), set()
+        for op, arg in zip(cp.ops, cp.args):
+            if op == OP_ADD or op == OP_SUB:
+                le.add(arg)
+                es.add(arg)
+            elif op == OP_SE:
+                le.add(arg)
+        leitura.append(le)
+        escrita.append(es)
+
+    # ponto fixo sobre o grafo de chamadas (aceita recursão)
+    mudou = True
+    while mudou:
+        mudou = False
+        for pid, chamados in enumerate(bib.chamadas):
+            for chamado in chamados:
+                if not leitura[chamado] <= leitura[pid] or not escrita[chamado] <= escrita[pid]:
+                    leitura[pid] |= leitura[chamado]
+                    escrita[pid] |= escrita[chamado]
+                    mudou = True
+    return [tuple(sorted(le)) for le in leitura], [tuple(sorted(es)) for es in escrita]
+
+# ==========================================
+# Biblioteca: programas compilados uma única vez e chamados por índice
+# ==========================================
+class Biblioteca:
+    __slots__ = (
+        "programas", "n_regs", "ids", "compilados", "chamadas", "fontes", "tamanho",
+        "memo", "_registradores",
+    )
+
+    def __init__(self, programas: Dict[str, Dict[int, str]], n_regs: int):
+        self.programas = programas
+        self.n_regs = n_regs
+        self.ids: Dict[str, int] = {}
+        self.compilados: List[ProgramaCompilado] = []
+        self.chamadas: List[List[int]] = []  # macros de cada programa, por índice
+        self.fontes: List[Optional[Dict[int, str]]] = []   # cópia do texto compilado de cada programa
+        self.tamanho = len(programas)
+        self.memo = MemoMacros()
+        self._registradores = None   # (leitura, escrita) por programa, calculado sob demanda
+
+    def _registrar(self, arquivo: str) -> None:
+        self.ids[arquivo] = len(self.compilados)
+        self.compilados.append(None)
+        self.chamadas.append([])
+        self.fontes.append(None)
+
+    def _compilar(self, pendentes: List[str]) -> None:
+        # compila os pendentes e todas as macros alcançáveis a partir deles
+        self._registradores = None
+        while pendentes:
+            nome = pendentes.pop()
+            pid = self.ids[nome]
+            cp = compilar_programa(self.programas, nome, self.n_regs)
+            self.compilados[pid] = cp
+            fonte = self.programas.get(nome)
+            self.fontes[pid] = None if fonte is None else dict(fonte)
+            self.chamadas[pid] = []
+            for macro in cp.macros:
+                if macro not in self.ids:
+                    self._registrar(macro)
+                    pendentes.append(macro)
+                self.chamadas[pid].append(self.ids[macro])
+
+    def id_de(self, arquivo: str) -> int:
+        if arquivo not in self.ids:
+            self._registrar(arquivo)
+            self._compilar([arquivo])
+        return self.ids[arquivo]
+
+    def invalidar(self, arquivos: Sequence[str]) -> List[str]:
+        # recompila os arquivos alterados e todos os programas que os chamam
+        chamadores: Dict[int, List[int]] = {}
+        for pid, chamados in enumerate(self.chamadas):
+            for chamado in chamados:
+                chamadores.setdefault(chamado, []).append(pid)
+        alterados = set(arquivos)
+        pendentes = [self.ids[a] for a in alterados if a in self.ids]
+        pendentes += [
+            pid for pid, cp in enumerate(self.compilados)
+            if alterados.intersection(cp.macros_ausentes)
+        ]
+        afetados = set()
+        while pendentes:
+            pid = pendentes.pop()
+            if pid not in afetados:
+                afetados.add(pid)
+                pendentes.extend(chamadores.get(pid, []))
+
+        nomes = {pid: nome for nome, pid in self.ids.items()}
+        self._compilar([nomes[pid] for pid in afetados])
+        self.tamanho = len(self.programas)
+        if afetados:
+            self.memo.limpar()
+        return [nomes[pid] for pid in sorted(afetados)]
+
+    def fecho(self, pid: int) -> List[int]:
+        # programas alcançáveis a partir de pid, em ordem de descoberta
+        ordem = [pid]
+        vistos = {pid}
+        for atual in ordem:
+            for chamado in self.chamadas[atual]:
+                if chamado not in vistos:
+                    vistos.add(chamado)
+                    ordem.append(chamado)
+        return ordem
+
+    def assinatura(self, pid: int) -> str:
+        # hash das fontes de pid e de todas as macros que ele alcança
+        h = hashlib.sha1(str(self.n_regs).encode())
+        for p in self.fecho(pid):
+            h.update(f"\0{self.compilados[p].arquivo}\0{sorted((self.fontes[p] or {}).items())!r}".encode())
+        return h.hexdigest()
+
+    def registradores(self) -> Tuple[List[Tuple[int, ...]], List[Tuple[int, ...]]]:
+        if self._registradores is None:
+            self._registradores = registradores_por_programa(self)
+        return self._registradores
+
+    def atualizada(self, programas: Dict[str, Dict[int, str]]) -> bool:
+        if programas is not self.programas or len(programas) != self.tamanho:
+            return False
+        # compara o conteúdo: uma linha editada no próprio dict também invalida
+        for arquivo, pid in self.ids.items():
+            if programas.get(arquivo) != self.fontes[pid]:
+                return False
+        return True
+
+
+LIMITE_CACHE_BIBLIOTECAS = 8
+_cache_bibliotecas: Dict[Tuple[int, int], Biblioteca] = {}
+
+
+def obter_biblioteca(programas: Dict[str, Dict[int, str]], n_regs: int) -> Biblioteca:
+    chave = (id(programas), n_regs)
+    bib = _cache_bibliotecas.pop(chave, None)
+    if bib is None or not bib.atualizada(programas):
+        bib = Biblioteca(programas, n_regs)
+    _cache_bibliotecas[chave] = bib  # reinsere no fim: ordem de uso recente
+    while len(_cache_bibliotecas) > LIMITE_CACHE_BIBLIOTECAS:
+        del _cache_bibliotecas[next(iter(_cache_bibliotecas))]
+    return bib
+
+# ======================================
+# Perfil de execução: contadores por instrução e por macro
+# ======================================
+class Perfil:
+    # contagens[pid][pc] = quantas vezes a linha que começa em pc foi executada;
+    # as pilhas de macros formam uma árvore (nós) com os passos exclusivos de cada uma
+    def __init__(self):
+        self.bib: Optional[Biblioteca] = None
+        self.contagens: List[List[int]] = []
+        self.chamadas: List[int] = []        # chamadas por programa
+        self.inclusivos: List[int] = []      # passos com o programa na pilha (recursão conta uma vez)
+        self._ativos: List[int] = []
+        self.no_pai: List[int] = [-1]        # nó 0: raiz vazia
+        self.no_pid: List[int] = [-1]
+        self.no_passos: List[int] = [0]
+        self._filhos: Dict[Tuple[int, int], int] = {}
+        self._pilha_nos: List[int] = []
+        self._no = 0
+        self._marca = 0
+        self.inicio: Optional[int] = None   # pid do programa de entrada
+        self._passos_inicio = 0
+
+    def preparar(self) -> None:
+        # a biblioteca pode ter compilado programas novos desde a última rodada
+        for cp in self.bib.compilados[len(self.contagens):]:
+            self.contagens.append([0] * len(cp.ops))
+            self.chamadas.append(0)
+            self.inclusivos.append(0)
+            self._ativos.append(0)
+
+    def vincular(self, bib: "Biblioteca", pid: int, passos: int) -> None:
+        if self.bib is None:
+            self.bib = bib
+        elif self.bib is not bib:
+            raise ValueError("Este perfil já foi usado com outra biblioteca.")
+        self.preparar()
+        if self._no == 0:   # nova execução (um perfil pode acumular várias)
+            self.inicio = pid
+            self._passos_inicio = self._marca = passos
+            self.entrar(pid, passos)
+
+    def entrar(self, pid: int, passos: int) -> None:
+        self.no_passos[self._no] += passos - self._marca
+        self._marca = passos
+        self._pilha_nos.append(self._no)
+        chave = (self._no, pid)
+        no = self._filhos.get(chave)
+        if no is None:
+            no = self._filhos[chave] = len(self.no_pid)
+            self.no_pai.append(self._no)
+            self.no_pid.append(pid)
+            self.no_passos.append(0)
+        self._no = no
+        self.chamadas[pid] += 1
+        self._ativos[pid] += 1
+
+    def sair(self, pid: int, inicio: int, passos: int) -> None:
+        self.descarregar(passos)
+        self._no = self._pilha_nos.pop()
+        self._ativos[pid] -= 1
+        if not self._ativos[pid]:
+            self.inclusivos[pid] += passos - inicio
+
+    def concluir(self, passos: int) -> None:
+        self.sair(self.inicio, self._passos_inicio, passos)
+
+    def descarregar(self, passos: int) -> None:
+        self.no_passos[self._no] += passos - self._marca
+        self._marca = passos
+
+# ======================================
+# Execução: interpreta um arquivo .txt
+# ======================================
+VERSAO_ESTADO = 1
+PASSOS_POR_FATIA = 100_000   # com prazo, o relógio é consultado a cada fatia
+
+
+def _posicao(cp: ProgramaCompilado, pc: int) -> Tuple[int, int]:
+    # (linha, deslocamento dentro da linha): independe de onde a linha cai no código
+    linha = cp.linhas[pc]
+    return linha, pc - cp.inicio.get(linha, 0)
+
+
+class Execucao:
+    __slots__ = (
+        "bib", "pilha", "pid", "pc", "valores", "passos", "concluida", "profundidade_maxima",
+        "passos_acelerados", "operacoes_em_bloco",
+    )
 
-    atual = linhas[0]  
+    def __init__(self, bib: Biblioteca, arquivo: str, valores: List[int]):
+        self.bib = bib
+        # quadros (programa, índice de retorno, chave na memo ou None, passos na chamada)
+        self.pilha: List[Tuple[int, int, Optional[tuple], int]] = []
+        self.pid = bib.id_de(arquivo)
+        self.pc = 0             # sempre no início de uma linha ainda não contada
+        self.valores = valores
+        self.passos = 0         # linhas executadas (passos da computação)
+        self.concluida = False
+        self.profundidade_maxima = 0   # maior número de macros aninhadas na pilha
+        self.passos_acelerados = 0     # passos aplicados de uma vez (laços acelerados e memo)
+        self.operacoes_em_bloco = 0    # quantas aplicações em bloco foram feitas
 
+    @property
+    def iteracoes(self) -> int:
+        # trabalho físico: linhas interpretadas uma a uma mais cada operação em bloco
+        return self.passos - self.passos_acelerados + self.operacoes_em_bloco
+
+    def rodar(
+        self,
+        limite_passos: Optional[int] = None,
+        acelerar: bool = True,
+        log: bool = False,
+        memoizar: bool = True,
+        perfil: Optional[Perfil] = None,
+        prazo: Optional[float] = None,
+    ) -> bool:
+        # para ao concluir, ao gastar limite_passos ou depois de prazo segundos;
+        # em qualquer parada a execução pode continuar com outra chamada a rodar
+        if self.concluida:
+            return True
+        limite = float("inf") if limite_passos is None else self.passos + limite_passos
+        # com log ou perfil cada linha precisa ser vista, então nada sai da memo
+        memo = self.bib.memo if memoizar and not log and perfil is None else None
+        if prazo is None:
+            _rodar(self, limite, acelerar, log, memo, perfil)
+            return self.concluida
+        fim = time.monotonic() + prazo
+        while not self.concluida and self.passos < limite:
+            _rodar(self, min(limite, self.passos + PASSOS_POR_FATIA), acelerar, log, memo, perfil)
+            if time.monotonic() >= fim:
+                break
+        return self.concluida
+
+    def estado(self) -> dict:
+        # forma serializável (JSON): quadros como (arquivo, linha, deslocamento, passos na chamada)
+        compilados = self.bib.compilados
+        quadros = [
+            [compilados[pid].arquivo, *_posicao(compilados[pid], pc), inicio]
+            for pid, pc, _, inicio in self.pilha
+        ]
+        quadros.append([compilados[self.pid].arquivo, *_posicao(compilados[self.pid], self.pc), None])
+        entrada = self.pilha[0][0] if self.pilha else self.pid
+        return {
+            "versao": VERSAO_ESTADO,
+            "n_regs": self.bib.n_regs,
+            "assinatura": self.bib.assinatura(entrada),
+            "quadros": quadros,
+            "valores": list(self.valores),
+            "passos": self.passos,
+            "concluida": self.concluida,
+            "profundidade_maxima": self.profundidade_maxima,
+            "passos_acelerados": self.passos_acelerados,
+            "operacoes_em_bloco": self.operacoes_em_bloco,
+        }
+
+    @classmethod
+    def de_estado(cls, bib: Biblioteca, estado: dict) -> "Execucao":
+        if estado.get("versao") != VERSAO_ESTADO:
+            raise ValueError(f"Versão de estado não suportada: {estado.get('versao')}")
+        if estado["n_regs"] != bib.n_regs:
+            raise ValueError(f"Estado com {estado['n_regs']} registradores; a biblioteca usa {bib.n_regs}.")
+        quadros = estado["quadros"]
+        ex = cls(bib, quadros[0][0], [int(v) for v in estado["valores"]])
+        if bib.assinatura(ex.pid) != estado["assinatura"]:
+            raise ValueError("Os programas mudaram desde que o estado foi salvo.")
+        posicoes = []
+        for arquivo, linha, deslocamento, inicio in quadros:
+            cp = bib.compilados[bib.id_de(arquivo)]
+            pc = cp.inicio.get(linha, 0) + deslocamento
+            if not 0 <= pc < len(cp.ops):
+                raise ValueError(f"Posição inválida no estado: {arquivo}:{linha}+{deslocamento}")
+            posicoes.append((bib.ids[arquivo], pc, inicio))
+        # quadros restaurados não guardam resultado na memo (as entradas originais se perderam)
+        ex.pilha = [(pid, pc, None, inicio) for pid, pc, inicio in posicoes[:-1]]
+        ex.pid, ex.pc = posicoes[-1][:2]
+        ex.passos = estado["passos"]
+        ex.concluida = estado["concluida"]
+        ex.profundidade_maxima = estado.get("profundidade_maxima", len(ex.pilha))
+        ex.passos_acelerados = estado.get("passos_acelerados", 0)
+        ex.operacoes_em_bloco = estado.get("operacoes_em_bloco", 0)
+        return ex
+
+
+def _rodar(
+    ex: Execucao,
+    limite,
+    acelerar: bool,
+    log: bool,
+    memo: Optional[MemoMacros],
+    perfil: Optional[Perfil] = None,
+) -> None:
+    # pilha explícita de quadros: macros não usam recursão em Python
+    bib, pilha, valores, passos = ex.bib, ex.pilha, ex.valores, ex.passos
+    pid, pc = ex.pid, ex.pc
+    acelerados, blocos = ex.passos_acelerados, ex.operacoes_em_bloco
+    if memo is not None:
+        leitura, escrita = bib.registradores()
+    if perfil is not None:
+        perfil.vincular(bib, pid, passos)
+        contagens = perfil.contagens[pid]
+    observar = log or perfil is not None
+    cp = bib.compilados[pid]
+    ops = cp.ops_otimizados if acelerar else cp.ops
+    args, alvos, lacos, chamadas = cp.args, cp.alvos, cp.lacos, bib.chamadas[pid]
+
+    entrar = bool(cp.inicio)
     while True:
-        blocos = list(blocos_por_linha[atual])
-        i = 0
-
-        if log:
-            print(f"[{arquivo}:{atual}]")
-
-        while i < len(blocos):
-            b = blocos[i]
-            if b.startswith("faca "):
-                b = b.split(" ", 1)[1]
-
-            if b.startswith("se zero_"):
-                reg_nome = b.split("zero_", 1)[1]  
-                idx = ord(reg_nome) - ord("a")   
-                reg = regs[idx]                  
-                try:
-                    idx_senao = blocos.index("senao", i + 1)
-                except ValueError:
-                    return
-                ini_true = i + 1
-                if ini_true < len(blocos) and blocos[ini_true] == "entao":
-                    ini_true += 1
-                true_part  = blocos[ini_true:idx_senao]   
-                false_part = blocos[idx_senao + 1:]     
-                escolhido = true_part if reg.zero() else false_part
-                blocos = blocos[:i] + escolhido
-                continue
+        if entrar:
+            # início de uma linha: um passo da computação
+            entrar = False
+            if passos >= limite:
+                break
+            passos += 1
+            if observar:
+                if log:
+                    print(f"[{cp.arquivo}:{cp.linhas[pc]}]")
+                if perfil is not None:
+                    contagens[pc] += 1
 
-            if b.startswith("va_para"):
-                partes = b.split()
-                if len(partes) != 2 or not partes[1].isdigit():
-                    return
-                atual = int(partes[1])
+        op = ops[pc]
+        if op == OP_SE:
+            pc = pc + 1 if valores[args[pc]] == 0 else alvos[pc]
+        elif op == OP_VA:
+            pc = alvos[pc]
+            entrar = True
+        elif op == OP_ADD:
+            valores[args[pc]] += 1
+            pc += 1
+        elif op == OP_SUB:
+            r = args[pc]
+            if valores[r]:
+                valores[r] -= 1
+            pc += 1
+        elif op == OP_LACO:
+            laco = lacos[pc]
+            k = valores[laco.contador]
+            if passos + k * laco.passos > limite:
+                k = int(limite - passos) // laco.passos
+            if k:
+                laco.aplicar(valores, k)
+                passos += k * laco.passos
+                acelerados += k * laco.passos
+                blocos += 1
+                if perfil is not None:
+                    for e in laco.entradas:
+                        contagens[e] += k
+            # depois das voltas aceleradas segue como o "se zero_" original
+            pc = pc + 1 if valores[laco.contador] == 0 else alvos[pc]
+        elif op == OP_MACRO:
+            chamado = chamadas[args[pc]]
+            chave = None
+            if memo is not None:
+                chave = (chamado, *[valores[r] for r in leitura[chamado]])
+                salvo = memo.buscar(chave, limite - passos)
+                if salvo is not None:
+                    for r, v in zip(escrita[chamado], salvo[0]):
+                        valores[r] = v
+                    passos += salvo[1]
+                    acelerados += salvo[1]
+                    blocos += 1
+                    pc += 1
+                    continue
+            pilha.append((pid, pc + 1, chave, passos))
+            if len(pilha) > ex.profundidade_maxima:
+                ex.profundidade_maxima = len(pilha)
+            pid = chamado
+            if perfil is not None:
+                perfil.entrar(pid, passos)
+                contagens = perfil.contagens[pid]
+            cp = bib.compilados[pid]
+            ops = cp.ops_otimizados if acelerar else cp.ops
+            args, alvos, lacos, chamadas = cp.args, cp.alvos, cp.lacos, bib.chamadas[pid]
+            pc = 0
+            entrar = bool(cp.inicio)
+        else:
+            if not pilha:
+                ex.concluida = True
+                if perfil is not None:
+                    perfil.concluir(passos)
                 break
+            chamado = pid
+            pid, pc, chave, inicio = pilha.pop()
+            if chave is not None:
+                memo.guardar(chave, tuple([valores[r] for r in escrita[chamado]]), passos - inicio)
+            if perfil is not None:
+                perfil.sair(chamado, inicio, passos)
+                contagens = perfil.contagens[pid]
+            cp = bib.compilados[pid]
+            ops = cp.ops_otimizados if acelerar else cp.ops
+            args, alvos, lacos, chamadas = cp.args, cp.alvos, cp.lacos, bib.chamadas[pid]
 
-            if b.startswith("add_"):
-                idx = ord(b[4:]) - ord("a")
-                if idx < 0 or idx >= len(regs): return
-                regs[idx].inc()
-                i += 1
-                continue
+    if perfil is not None:
+        perfil.descarregar(passos)
+    ex.pid, ex.pc, ex.passos = pid, pc, passos
+    ex.passos_acelerados, ex.operacoes_em_bloco = acelerados, blocos
 
-            if b.startswith("sub_"):
-                idx = ord(b[4:]) - ord("a")
-                if idx < 0 or idx >= len(regs): return
-                regs[idx].dec()
-                i += 1
-                continue
 
-            if b.startswith("m_"):
-                nome_macro = b[2:]
-                if not nome_macro.endswith(".txt"):
-                    nome_macro += ".txt"
-                if nome_macro not in programas:
+def executar(
+    programas: Dict[str, Dict[int, str]],
+    regs: Registradores,
+    arquivo: str = "main.txt",
+    log: bool = False,  
+    acelerar: bool = True,
+    memoizar: bool = True,
+    perfil: Optional[Perfil] = None,
+) -> None:
+    # com log cada linha precisa ser visitada, então os laços rodam passo a passo
+    valores = _abrir_registradores(regs)
+    try:
+        ex = Execucao(obter_biblioteca(programas, len(regs)), arquivo, valores)
+        ex.rodar(acelerar=acelerar and not log, log=log, memoizar=memoizar, perfil=perfil)
+    finally:
+        _devolver_registradores(regs, valores)
+
+# ======================================
+# Rastreamento: passos da execução gerados sob demanda
+# ======================================
+class Passo(NamedTuple):
+    tipo: str                 # "STATE" (início de linha), "INFO" (fim de programa) ou "ERROR"
+    arquivo: str
+    linha: int
+    regs: Tuple[int, ...]     # registradores no início da linha
+
+
+def _rastrear(
+    bib: Biblioteca,
+    pid: int,
+    valores: List[int],
+    limite_passos: Optional[int],
+    pilha: Optional[List[Tuple[int, int]]] = None,
+    pc: int = 0,
+    limite_por_macro: bool = False,
+) -> Iterator[Passo]:
+    # pilha (programa, índice de retorno) e pc permitem recomeçar de um estado salvo,
+    # sempre no início de uma linha. Com limite_por_macro cada chamada tem o próprio
+    # contador, e estourá-lo numa macro só encerra aquela chamada
+    pilha = [] if pilha is None else pilha
+    cp = bib.compilados[pid]
+    ops, args, alvos, linhas, chamadas = cp.ops, cp.args, cp.alvos, cp.linhas, bib.chamadas[pid]
+    limite = float("inf") if limite_passos is None else limite_passos
+
+    passos = 0
+    contadores = [0] * len(pilha)   # passos dos chamadores, com limite_por_macro
+    nova_linha = bool(cp.inicio)
+    while True:
+        if nova_linha:
+            # início de uma linha: um passo da computação
+            nova_linha = False
+            if passos >= limite:
+                yield Passo("ERROR", cp.arquivo, linhas[pc], tuple(valores))
+                if not limite_por_macro or not pilha:
                     return
-                executar(programas, regs, nome_macro, log=log)
-                i += 1
+                passos = contadores.pop()
+                pid, pc = pilha.pop()
+                cp = bib.compilados[pid]
+                ops, args, alvos, linhas, chamadas = cp.ops, cp.args, cp.alvos, cp.linhas, bib.chamadas[pid]
                 continue
+            passos += 1
+            yield Passo("STATE", cp.arquivo, linhas[pc], tuple(valores))
 
+        op = ops[pc]
+        if op == OP_SE:
+            pc = pc + 1 if valores[args[pc]] == 0 else alvos[pc]
+        elif op == OP_VA:
+            pc = alvos[pc]
+            nova_linha = True
+        elif op == OP_ADD:
+            valores[args[pc]] += 1
+            pc += 1
+        elif op == OP_SUB:
+            r = args[pc]
+            if valores[r]:
+                valores[r] -= 1
+            pc += 1
+        elif op == OP_MACRO:
+            pilha.append((pid, pc + 1))
+            if limite_por_macro:
+                contadores.append(passos)
+                passos = 0
+            pid = chamadas[args[pc]]
+            cp = bib.compilados[pid]
+            ops, args, alvos, linhas, chamadas = cp.ops, cp.args, cp.alvos, cp.linhas, bib.chamadas[pid]
+            pc = 0
+            nova_linha = bool(cp.inicio)
         else:
-            proxima = prox_linha(atual)
-            if proxima is None:
+            if op == OP_FIM:
+                yield Passo("INFO", cp.arquivo, linhas[pc], tuple(valores))
+            if not pilha:
                 return
-            atual = proxima
-            continue
+            if limite_por_macro:
+                passos = contadores.pop()
+            pid, pc = pilha.pop()
+            cp = bib.compilados[pid]
+            ops, args, alvos, linhas, chamadas = cp.ops, cp.args, cp.alvos, cp.linhas, bib.chamadas[pid]
+
+
+def rastrear(
+    programas: Dict[str, Dict[int, str]],
+    regs: Registradores,
+    arquivo: str = "main.txt",
+    limite_passos: Optional[int] = 1000,
+    limite_por_macro: bool = False,
+) -> Iterator[Passo]:
+    # limite_passos vale para a execução inteira, ou para cada chamada com limite_por_macro
+    valores = _abrir_registradores(regs)
+    try:
+        bib = obter_biblioteca(programas, len(regs))
+        yield from _rastrear(bib, bib.id_de(arquivo), valores, limite_passos, limite_por_macro=limite_por_macro)
+    finally:
+        _devolver_registradores(regs, valores)
+
+
+def formatar_passo(
+    passo: Passo,
+    programas: Dict[str, Dict[int, str]],
+    nomes: Sequence[str],
+) -> str:
+    if passo.tipo == "INFO":
+        return "INFO|--- Fim da Execução ---"
+    if passo.tipo == "ERROR":
+        return "ERROR|Limite de execução excedido. Possível loop infinito."
+    estado_regs = ", ".join(f"{n}={v}" for n, v in zip(nomes, passo.regs))
+    instrucao = programas[passo.arquivo].get(passo.linha, "")
+    return f"STATE|[{passo.arquivo}:{passo.linha}] -> {instrucao.ljust(50)} | Regs: [{estado_regs}]"
 
 # ======================================
 # Execução: interpreta um arquivo .txt (com logs)
 # ======================================
+LIMITE_PASSOS_POR_MACRO = 1001
+
+
 def executar_com_logs(
     programas: Dict[str, Dict[int, str]],
-    regs: List[Registrador],
+    regs: Registradores,
     arquivo: str = "main.txt",
-    log_acumulado: List[str] = None
-) -> Tuple[List[Registrador], List[str]]:
-    
+    log_acumulado: List[str] = None,
+    limite_passos: Optional[int] = LIMITE_PASSOS_POR_MACRO,
+    limite_por_macro: bool = True,
+) -> Tuple[Registradores, List[str]]:
+    # por padrão, o limite do interpretador original: cada chamada (o programa
+    # principal e cada macro) executa até 1001 linhas; ao passar disso registra o
+    # ERROR e volta para quem chamou. limite_por_macro=False aplica limite_passos
+    # à execução inteira e para no primeiro ERROR
     if log_acumulado is None:
         log_acumulado = []
 
-    prog = programas.get(arquivo)
-    if not prog:
-        return regs, log_acumulado
-
-    blocos_por_linha = {ln: quebrar_em_blocos(txt) for ln, txt in prog.items()}
-    linhas = sorted(blocos_por_linha)
-    if not linhas:
-        return regs, log_acumulado
-
-    def prox_linha(ln: int):
-        try:
-            i = linhas.index(ln)
-            return linhas[i + 1]
-        except (ValueError, IndexError): return None
-
-    atual = linhas[0]
-    passos_limite = 1000 
-    passos_executados = 0
-    while True:
-        if passos_executados > passos_limite:
-            log_acumulado.append("ERROR|Limite de execução excedido. Possível loop infinito.")
-            return regs, log_acumulado
-        passos_executados += 1
-    
-        estado_regs = ", ".join(map(str, regs))
-        instrucao = prog.get(atual, "") 
-        log_acumulado.append(f"STATE|[{arquivo}:{atual}] -> {instrucao.ljust(50)} | Regs: [{estado_regs}]")
-
-        blocos = list(blocos_por_linha[atual])
-        i = 0
-        while i < len(blocos):
-            b = blocos[i]
-            if b.startswith("faca "): b = b.split(" ", 1)[1]
-            if b.startswith("se zero_"):
-                reg_nome = b.split("zero_", 1)[1]
-                idx = ord(reg_nome) - ord("a")
-                if not (0 <= idx < len(regs)): return regs, log_acumulado
-                reg = regs[idx]
-                try:
-                    idx_senao = blocos.index("senao", i + 1)
-                    ini_true = i + 1
-                    if ini_true < len(blocos) and blocos[ini_true] == "entao": ini_true += 1
-                    true_part = blocos[ini_true:idx_senao]
-                    false_part = blocos[idx_senao + 1:]
-                    blocos = blocos[:i] + (true_part if reg.zero() else false_part)
-                    continue
-                except ValueError:
-                    return regs, log_acumulado 
-
-            if b.startswith("va_para"):
-                partes = b.split()
-                if len(partes) != 2 or not partes[1].isdigit(): return regs, log_acumulado 
-                nova_linha = int(partes[1])
-                if nova_linha not in prog: return regs, log_acumulado 
-                atual = nova_linha
-                break
-
-            if b.startswith("add_"):
-                idx = ord(b[4:]) - ord("a")
-                if not (0 <= idx < len(regs)): return regs, log_acumulado
-                regs[idx].inc()
-                i += 1; continue
-
-            if b.startswith("sub_"):
-                idx = ord(b[4:]) - ord("a")
-                if not (0 <= idx < len(regs)): return regs, log_acumulado 
-                regs[idx].dec()
-                i += 1; continue
-
-            if b.startswith("m_"):
-                nome_macro = b[2:] + ".txt" if not b.endswith(".txt") else b[2:]
-                if nome_macro not in programas: return regs, log_acumulado 
-                regs, log_acumulado = executar_com_logs(programas, regs, nome_macro, log_acumulado)
-                i += 1; continue
-            i += 1
-        else:
-            proxima = prox_linha(atual)
-            if proxima is None:
-                log_acumulado.append("INFO|--- Fim da Execução ---")
-                return regs, log_acumulado
-            atual = proxima; continue
+    nomes = [r.nome for r in regs]
+    for passo in rastrear(programas, regs, arquivo, limite_passos, limite_por_macro):
+        log_acumulado.append(formatar_passo(passo, programas, nomes))
     return regs, log_acumulado
@@ -0,0 +1,150 @@
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from norma import (
+    OP_VA, BancoRegistradores, Execucao, Perfil, Registradores,
+    _abrir_registradores, _devolver_registradores, ler_programas, obter_biblioteca,
+)
+
+# ============================
+# Execução com perfil
+# ============================
+def perfilar(
+    programas: Dict[str, Dict[int, str]],
+    regs: Registradores,
+    arquivo: str = "main.txt",
+    limite_passos: Optional[int] = None,
+    acelerar: bool = True,
+    perfil: Optional[Perfil] = None,
+) -> Perfil:
+    # passe o mesmo perfil em várias chamadas para acumular execuções
+    perfil = perfil if perfil is not None else Perfil()
+    valores = _abrir_registradores(regs)
+    try:
+        ex = Execucao(obter_biblioteca(programas, len(regs)), arquivo, valores)
+        ex.rodar(limite_passos, acelerar=acelerar, perfil=perfil)
+    finally:
+        _devolver_registradores(regs, valores)
+    return perfil
+
+
+# ============================
+# Consultas sobre os contadores
+# ============================
+class LacoQuente(NamedTuple):
+    arquivo: str
+    inicio: int         # linha de destino do salto para trás
+    fim: int            # linha do salto
+    passos: int         # linhas executadas dentro do laço
+    voltas: int         # execuções da linha de início
+    acelerado: str      # tipo do laço acelerado ("zerar", "transferir", ...) ou "" se não for
+
+
+def linhas_quentes(perfil: Perfil) -> List[Tuple[str, int, int]]:
+    # (arquivo, linha, execuções), da mais executada para a menos
+    resultado = []
+    for pid, contagens in enumerate(perfil.contagens):
+        cp = perfil.bib.compilados[pid]
+        for ln, pc in cp.inicio.items():
+            if contagens[pc]:
+                resultado.append((cp.arquivo, ln, contagens[pc]))
+    resultado.sort(key=lambda t: -t[2])
+    return resultado
+
+
+def resumo_macros(perfil: Perfil) -> List[Tuple[str, int, int, int]]:
+    # (arquivo, chamadas, passos exclusivos, passos inclusivos)
+    resultado = []
+    for pid, chamadas in enumerate(perfil.chamadas):
+        if chamadas:
+            cp = perfil.bib.compilados[pid]
+            resultado.append((cp.arquivo, chamadas, sum(perfil.contagens[pid]), perfil.inclusivos[pid]))
+    resultado.sort(key=lambda t: -t[3])
+    return resultado
+
+
+def lacos_quentes(perfil: Perfil) -> List[LacoQuente]:
+    # cada salto para trás (va_para para uma linha anterior ou a mesma) delimita um laço
+    resultado = []
+    for pid, contagens in enumerate(perfil.contagens):
+        cp = perfil.bib.compilados[pid]
+        vistos = set()
+        for pc, op in enumerate(cp.ops):
+            if op != OP_VA:
+                continue
+            inicio, fim = cp.linhas[cp.alvos[pc]], cp.linhas[pc]
+            if inicio > fim or (inicio, fim) in vistos:
+                continue
+            vistos.add((inicio, fim))
+            corpo = [cp.inicio[ln] for ln in cp.inicio if inicio <= ln <= fim]
+            passos = sum(contagens[p] for p in corpo)
+            if passos:
+                acelerado = next((
+                    laco.tipo for laco in cp.lacos.values()
+                    if min(cp.linhas[e] for e in laco.entradas) == inicio
+                    and max(cp.linhas[e] for e in laco.entradas) == fim
+                ), "")
+                resultado.append(LacoQuente(cp.arquivo, inicio, fim, passos, contagens[cp.inicio[inicio]], acelerado))
+    resultado.sort(key=lambda l: -l.passos)
+    return resultado
+
+
+def pilhas_colapsadas(perfil: Perfil) -> List[str]:
+    # formato "a.txt;b.txt;c.txt passos" lido por flamegraph.pl, speedscope etc.
+    nomes = [cp.arquivo for cp in perfil.bib.compilados]
+    linhas = []
+    for no in range(1, len(perfil.no_pid)):
+        if not perfil.no_passos[no]:
+            continue
+        caminho = []
+        atual = no
+        while atual > 0:
+            caminho.append(nomes[perfil.no_pid[atual]])
+            atual = perfil.no_pai[atual]
+        linhas.append(f"{';'.join(reversed(caminho))} {perfil.no_passos[no]}")
+    return linhas
+
+
+def gravar_pilhas(perfil: Perfil, caminho: str) -> None:
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.writelines(linha + "\n" for linha in pilhas_colapsadas(perfil))
+
+
+# ============================
+# Relatório em texto
+# ============================
+def relatorio(perfil: Perfil, programas: Optional[Dict[str, Dict[int, str]]] = None, limite: int = 15) -> str:
+    total = sum(perfil.no_passos)
+    saida = [f"Passos totais: {total}", "", "Linhas mais executadas:"]
+    for arquivo, ln, n in linhas_quentes(perfil)[:limite]:
+        texto = programas.get(arquivo, {}).get(ln, "") if programas else ""
+        saida.append(f"  {n:>12} {100 * n / total if total else 0:>6.1f}%  {arquivo}:{ln:<5} {texto}")
+
+    saida += ["", "Laços mais custosos:"]
+    for laco in lacos_quentes(perfil)[:limite]:
+        marca = f" (acelerado: {laco.acelerado})" if laco.acelerado else ""
+        saida.append(f"  {laco.passos:>12} {100 * laco.passos / total if total else 0:>6.1f}%  "
+                     f"{laco.arquivo}:{laco.inicio}-{laco.fim}  voltas={laco.voltas}{marca}")
+
+    saida += ["", f"  {'macro':<22} {'chamadas':>10} {'exclusivos':>12} {'inclusivos':>12}"]
+    for arquivo, chamadas, exclusivos, inclusivos in resumo_macros(perfil):
+        saida.append(f"  {arquivo:<22} {chamadas:>10} {exclusivos:>12} {inclusivos:>12}")
+    return "\n".join(saida)
+
+
+if __name__ == "__main__":
+    # uso: python perfil.py arquivo.txt [valores...] [--pilhas saida.txt]
+    argumentos = sys.argv[1:]
+    destino_pilhas = None
+    if "--pilhas" in argumentos:
+        i = argumentos.index("--pilhas")
+        destino_pilhas = argumentos[i + 1]
+        del argumentos[i:i + 2]
+    arquivo = argumentos[0] if argumentos else "main.txt"
+    valores = [int(v) for v in argumentos[1:]]
+    programas = ler_programas("macros")
+    regs = BancoRegistradores(valores + [0] * (7 - len(valores)))
+    resultado = perfilar(programas, regs, arquivo)
+    print(relatorio(resultado, programas))
+    print(f"\nRegistradores: {regs}")
+    if destino_pilhas:
+        gravar_pilhas(resultado, destino_pilhas)
@@ -0,0 +1,295 @@
+import csv
+import json
+import mmap
+import struct
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from norma import Passo
+
+# ============================
+# Destinos ("sinks") para os passos gerados por norma.rastrear
+# ============================
+class SinkLista:
+    def __init__(self):
+        self.passos: List[Passo] = []
+
+    def __call__(self, passo: Passo) -> None:
+        self.passos.append(passo)
+
+    def fechar(self) -> None:
+        pass
+
+
+class SinkAnel:
+    # guarda só os últimos k passos: memória limitada em execuções longas
+    def __init__(self, k: int = 1000):
+        self.passos = deque(maxlen=k)
+
+    def __call__(self, passo: Passo) -> None:
+        self.passos.append(passo)
+
+    def fechar(self) -> None:
+        pass
+
+
+class SinkContador:
+    # só conta os passos, sem guardá-los
+    def __init__(self):
+        self.total = 0
+        self.estados = 0   # passos "STATE": linhas executadas
+
+    def __call__(self, passo: Passo) -> None:
+        self.total += 1
+        if passo.tipo == "STATE":
+            self.estados += 1
+
+    def fechar(self) -> None:
+        pass
+
+
+class SinkArquivo:
+    # grava em JSON Lines ou CSV, acumulando registros e escrevendo em blocos
+    def __init__(self, caminho: str, formato: str = "jsonl", tamanho_bloco: int = 4096):
+        if formato not in ("jsonl", "csv"):
+            raise ValueError(f"Formato de rastro desconhecido: {formato}")
+        self.formato = formato
+        self.tamanho_bloco = tamanho_bloco
+        self.arquivo = open(caminho, "w", encoding="utf-8", newline="")
+        self.pendentes: list = []
+        if formato == "csv":
+            self._csv = csv.writer(self.arquivo)
+            self._csv.writerow(["tipo", "arquivo", "linha", "regs"])
+
+    def __call__(self, passo: Passo) -> None:
+        if self.formato == "jsonl":
+            self.pendentes.append(json.dumps(passo._asdict(), separators=(",", ":")) + "\n")
+        else:
+            self.pendentes.append((passo.tipo, passo.arquivo, passo.linha, " ".join(map(str, passo.regs))))
+        if len(self.pendentes) >= self.tamanho_bloco:
+            self.descarregar()
+
+    def descarregar(self) -> None:
+        if self.formato == "jsonl":
+            self.arquivo.writelines(self.pendentes)
+        else:
+            self._csv.writerows(self.pendentes)
+        self.pendentes.clear()
+
+    def fechar(self) -> None:
+        if not self.arquivo.closed:
+            self.descarregar()
+            self.arquivo.close()
+
+    def __enter__(self) -> "SinkArquivo":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+
+# ============================
+# Consome um rastro, repassando cada passo aos destinos
+# ============================
+def gravar_rastro(
+    passos: Iterable[Passo],
+    *destinos: Callable[[Passo], None],
+    fechar: bool = True,
+) -> Optional[Passo]:
+    ultimo = None
+    try:
+        for ultimo in passos:
+            for destino in destinos:
+                destino(ultimo)
+    finally:
+        if fechar:
+            for destino in destinos:
+                if hasattr(destino, "fechar"):
+                    destino.fechar()
+    return ultimo
+
+
+# ============================
+# Rastro binário: deltas por passo, quadros-chave periódicos e índice
+# ============================
+# Cabeçalho: MAGICO, versão, n_regs, intervalo entre quadros-chave.
+# Cada registro começa com um byte (tipo << 1 | chave) seguido de arquivo e
+# linha. Um quadro-chave traz todos os registradores; os demais só os pares
+# (registrador, diferença) que mudaram desde o registro anterior.
+# No fim: nomes dos arquivos, índice (passo, posição) dos quadros-chave e um
+# trailer com a posição desse rodapé, para leitura com mmap e acesso direto.
+MAGICO = b"NRMT"
+VERSAO_BINARIA = 1
+_TIPOS = ("STATE", "INFO", "ERROR")
+_TRAILER = struct.Struct("<Q4s")
+
+
+def _escrever_varint(buf: bytearray, n: int) -> None:
+    while n >= 0x80:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+def _ler_varint(dados, pos: int) -> Tuple[int, int]:
+    n = 0
+    deslocamento = 0
+    while True:
+        b = dados[pos]
+        pos += 1
+        n |= (b & 0x7F) << deslocamento
+        if b < 0x80:
+            return n, pos
+        deslocamento += 7
+
+
+def _zigzag(n: int) -> int:
+    return 2 * n if n >= 0 else -2 * n - 1
+
+
+def _dezigzag(n: int) -> int:
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+
+class GravadorBinario:
+    def __init__(self, caminho: str, n_regs: int, intervalo_chave: int = 1024, tamanho_bloco: int = 1 << 16):
+        self.arquivo = open(caminho, "wb")
+        self.n_regs = n_regs
+        self.intervalo_chave = intervalo_chave
+        self.tamanho_bloco = tamanho_bloco
+        self.ids: Dict[str, int] = {}
+        self.indice: List[Tuple[int, int]] = []   # (passo, posição do quadro-chave)
+        self.total = 0
+        self.posicao = 0
+        self.anterior: Tuple[int, ...] = ()
+        self.buf = bytearray(MAGICO)
+        self.buf.append(VERSAO_BINARIA)
+        _escrever_varint(self.buf, n_regs)
+        _escrever_varint(self.buf, intervalo_chave)
+
+    def __call__(self, passo: Passo) -> None:
+        buf = self.buf
+        chave = self.total % self.intervalo_chave == 0
+        if chave:
+            self.indice.append((self.total, self.posicao + len(buf)))
+        arquivo = self.ids.setdefault(passo.arquivo, len(self.ids))
+        buf.append(_TIPOS.index(passo.tipo) << 1 | chave)
+        _escrever_varint(buf, arquivo)
+        _escrever_varint(buf, passo.linha)
+        if chave:
+            for v in passo.regs:
+                _escrever_varint(buf, v)
+        else:
+            mudancas = [(r, v - a) for r, (v, a) in enumerate(zip(passo.regs, self.anterior)) if v != a]
+            _escrever_varint(buf, len(mudancas))
+            for r, d in mudancas:
+                _escrever_varint(buf, r)
+                _escrever_varint(buf, _zigzag(d))
+        self.anterior = passo.regs
+        self.total += 1
+        if len(buf) >= self.tamanho_bloco:
+            self.descarregar()
+
+    def descarregar(self) -> None:
+        self.arquivo.write(self.buf)
+        self.posicao += len(self.buf)
+        self.buf = bytearray()
+
+    def fechar(self) -> None:
+        if self.arquivo.closed:
+            return
+        rodape = self.posicao + len(self.buf)
+        buf = self.buf
+        _escrever_varint(buf, self.total)
+        _escrever_varint(buf, len(self.ids))
+        for nome in self.ids:
+            dados = nome.encode("utf-8")
+            _escrever_varint(buf, len(dados))
+            buf.extend(dados)
+        _escrever_varint(buf, len(self.indice))
+        for passo, posicao in self.indice:
+            _escrever_varint(buf, passo)
+            _escrever_varint(buf, posicao)
+        buf.extend(_TRAILER.pack(rodape, MAGICO))
+        self.descarregar()
+        self.arquivo.close()
+
+    def __enter__(self) -> "GravadorBinario":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+
+class LeitorBinario:
+    def __init__(self, caminho: str):
+        self._arquivo = open(caminho, "rb")
+        self.dados = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.dados[:4] != MAGICO or self.dados[4] != VERSAO_BINARIA:
+            raise ValueError(f"'{caminho}' não é um rastro binário da Máquina Norma.")
+        self.n_regs, pos = _ler_varint(self.dados, 5)
+        self.intervalo_chave, self._inicio = _ler_varint(self.dados, pos)
+
+        rodape, magico = _TRAILER.unpack_from(self.dados, len(self.dados) - _TRAILER.size)
+        if magico != MAGICO:
+            raise ValueError(f"Rastro '{caminho}' incompleto (gravador não foi fechado).")
+        self.total, pos = _ler_varint(self.dados, rodape)
+        n_nomes, pos = _ler_varint(self.dados, pos)
+        self.nomes: List[str] = []
+        for _ in range(n_nomes):
+            tamanho, pos = _ler_varint(self.dados, pos)
+            self.nomes.append(self.dados[pos:pos + tamanho].decode("utf-8"))
+            pos += tamanho
+        n_chaves, pos = _ler_varint(self.dados, pos)
+        self.chaves: List[int] = []   # posição do k-ésimo quadro-chave
+        for _ in range(n_chaves):
+            _, pos = _ler_varint(self.dados, pos)
+            posicao, pos = _ler_varint(self.dados, pos)
+            self.chaves.append(posicao)
+
+    def _decodificar(self, pos: int, regs: List[int]) -> Tuple[Passo, int]:
+        dados = self.dados
+        cabecalho = dados[pos]
+        arquivo, pos = _ler_varint(dados, pos + 1)
+        linha, pos = _ler_varint(dados, pos)
+        if cabecalho & 1:
+            for r in range(self.n_regs):
+                regs[r], pos = _ler_varint(dados, pos)
+        else:
+            n, pos = _ler_varint(dados, pos)
+            for _ in range(n):
+                r, pos = _ler_varint(dados, pos)
+                d, pos = _ler_varint(dados, pos)
+                regs[r] += _dezigzag(d)
+        return Passo(_TIPOS[cabecalho >> 1], self.nomes[arquivo], linha, tuple(regs)), pos
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __getitem__(self, n: int) -> Passo:
+        # volta ao quadro-chave mais próximo e reaplica no máximo intervalo_chave - 1 deltas
+        if n < 0:
+            n += self.total
+        if not 0 <= n < self.total:
+            raise IndexError("passo fora do rastro")
+        pos = self.chaves[n // self.intervalo_chave]
+        regs = [0] * self.n_regs
+        for _ in range(n % self.intervalo_chave + 1):
+            passo, pos = self._decodificar(pos, regs)
+        return passo
+
+    def __iter__(self) -> Iterator[Passo]:
+        pos = self._inicio
+        regs = [0] * self.n_regs
+        for _ in range(self.total):
+            passo, pos = self._decodificar(pos, regs)
+            yield passo
+
+    def fechar(self) -> None:
+        self.dados.close()
+        self._arquivo.close()
+
+    def __enter__(self) -> "LeitorBinario":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+from norma import Biblioteca, Execucao, ler_programas
+
+# ============================
+# Estado da execução em arquivo
+# ============================
+def salvar_estado(ex: Execucao, caminho: str) -> None:
+    # grava num temporário e renomeia: uma queda no meio nunca corrompe o estado anterior
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(ex.estado(), f, separators=(",", ":"))
+    os.replace(temporario, caminho)
+
+
+def carregar_estado(caminho: str, programas: Dict[str, Dict[int, str]], n_regs: Optional[int] = None) -> Execucao:
+    with open(caminho, "r", encoding="utf-8") as f:
+        estado = json.load(f)
+    return Execucao.de_estado(Biblioteca(programas, n_regs or estado["n_regs"]), estado)
+
+
+# ============================
+# Execução em fatias, retomando de onde parou
+# ============================
+def rodar_com_retomada(
+    programas: Dict[str, Dict[int, str]],
+    arquivo: str,
+    valores: List[int],
+    caminho: str,
+    limite_passos: Optional[int] = None,
+    prazo: Optional[float] = None,
+    acelerar: bool = True,
+) -> Execucao:
+    # se o arquivo de estado existe, continua a partir dele (valores é ignorado);
+    # ao parar, por conclusão, limite ou prazo, o estado é gravado de novo
+    if os.path.exists(caminho):
+        ex = carregar_estado(caminho, programas, len(valores))
+    else:
+        ex = Execucao(Biblioteca(programas, len(valores)), arquivo, list(valores))
+    ex.rodar(limite_passos, acelerar=acelerar, prazo=prazo)
+    salvar_estado(ex, caminho)
+    return ex
+
+
+if __name__ == "__main__":
+    # sai com 0 quando a execução termina e 2 quando parou e pode ser retomada
+    parser = argparse.ArgumentParser(description="Executa um programa em fatias, com retomada a partir de arquivo.")
+    parser.add_argument("arquivo")
+    parser.add_argument("valores", nargs="*", type=int)
+    parser.add_argument("--estado", required=True, help="arquivo JSON com o estado da execução")
+    parser.add_argument("--passos", type=int, help="limite de passos nesta rodada")
+    parser.add_argument("--prazo", type=float, help="limite de tempo (segundos) nesta rodada")
+    parser.add_argument("--regs", type=int, default=7)
+    parser.add_argument("--pasta", default="macros")
+    opcoes = parser.parse_args()
+
+    valores = opcoes.valores + [0] * (opcoes.regs - len(opcoes.valores))
+    ex = rodar_com_retomada(ler_programas(opcoes.pasta), opcoes.arquivo, valores, opcoes.estado,
+                            opcoes.passos, opcoes.prazo)
+    nomes = [chr(ord("a") + i) for i in range(len(ex.valores))]
+    print(f"passos={ex.passos} iteracoes={ex.iteracoes} concluida={ex.concluida} "
+          f"regs=[{', '.join(f'{n}={v}' for n, v in zip(nomes, ex.valores))}]")
+    sys.exit(0 if ex.concluida else 2)
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from norma import ler_programas  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def programas():
+    return ler_programas(os.path.join(RAIZ, "macros"))
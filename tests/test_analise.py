@@ -0,0 +1,70 @@
+from analise import analisar, verificar_programa
+from norma import OP_ABORTA, compilar_programa
+
+PROGRAMAS = {
+    "a.txt": {
+        1: "add_a sub_z",
+        2: "se zero_q entao va_para 1 senao va_para 9",
+        3: "se zero_a va_para 1",
+        4: "va_para x",
+        5: "m_nada",
+        6: "foo add_b",
+        7: "se zero_a entao va_para 1 senao faca m_b",
+    },
+    "b.txt": {1: "se zero_a entao va_para 7 senao faca add_k"},
+    "c.txt": {},
+}
+
+
+def _erros(diagnosticos):
+    return [(d.arquivo, d.linha, d.mensagem) for d in diagnosticos if d.gravidade == "erro"]
+
+
+# ============================
+# Diagnósticos vêm do compilador: um por OP_ABORTA
+# ============================
+def test_cada_abortamento_tem_um_diagnostico():
+    for arquivo in ("a.txt", "b.txt"):
+        cp = compilar_programa(PROGRAMAS, arquivo, 7)
+        abortos = [pc for pc, op in enumerate(cp.ops) if op == OP_ABORTA]
+        assert set(cp.motivos) <= set(abortos)
+        assert len(abortos) == len(cp.motivos) + len(cp.saltos_invalidos)
+        assert len(_erros(verificar_programa(PROGRAMAS, arquivo))) == len(abortos)
+
+
+def test_mensagens():
+    assert _erros(analisar(PROGRAMAS).diagnosticos) == [
+        ("a.txt", 1, "registrador 'z' inválido (disponíveis: a-g)"),
+        ("a.txt", 2, "registrador 'q' inválido (disponíveis: a-g)"),
+        ("a.txt", 3, "'se zero_a' sem 'senao'"),
+        ("a.txt", 4, "'va_para x' sem um número de linha"),
+        ("a.txt", 5, "macro 'nada.txt' não encontrada"),
+        ("b.txt", 1, "registrador 'k' inválido (disponíveis: a-g)"),
+        ("b.txt", 1, "va_para para a linha 7, que não existe"),
+    ]
+    avisos = [(d.arquivo, d.linha, d.mensagem) for d in verificar_programa(PROGRAMAS, "a.txt") if d.gravidade == "aviso"]
+    assert avisos == [("a.txt", 6, "instrução desconhecida ignorada: 'foo'")]
+    assert verificar_programa(PROGRAMAS, "c.txt")[0].mensagem == "programa vazio ou inexistente"
+
+
+def test_limite_de_registradores():
+    rel = analisar({"p.txt": {1: "add_c"}}, n_regs=2)
+    assert _erros(rel.diagnosticos) == [("p.txt", 1, "registrador 'c' inválido (disponíveis: a-b)")]
+    assert analisar({"p.txt": {1: "add_c"}}, n_regs=3).ok
+
+
+def test_macros_do_projeto_sem_erros(programas):
+    rel = analisar(programas)
+    assert rel.ok
+    assert rel.leitura["multi.txt"] == "abcd" and rel.chamadas["pot.txt"] == ["multi.txt"]
+    assert rel.recursivas == [["exemplomacro.txt"]]
+
+
+def test_registradores_necessarios(programas):
+    rel = analisar(programas)
+    assert rel.registradores_necessarios("multi.txt") == 4      # a-d
+    assert rel.registradores_necessarios("pot.txt") == 7        # a-e e g, inclusive pela macro
+    assert rel.registradores_necessarios("inexistente.txt") == 0
+    rel = analisar({"x.txt": {1: "se zero_c entao va_para 2 senao va_para 2", 2: ""}, "y.txt": {1: "m_x"}})
+    assert rel.registradores_necessarios("x.txt") == rel.registradores_necessarios("y.txt") == 3
+    assert analisar({"vazio.txt": {1: ""}}).registradores_necessarios("vazio.txt") == 0
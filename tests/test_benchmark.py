@@ -0,0 +1,38 @@
+from benchmark import comparar_com_base, imprimir_suite, medir_escalabilidade, passos_programa_linear
+
+
+def _resultado(tempo, passos=100, memoria=1000):
+    return {
+        "caso": "caso", "motor": "executar", "tempo": tempo, "passos": passos, "iteracoes": passos,
+        "passos_por_segundo": passos / tempo if tempo else None, "memoria_pico": memoria, "profundidade": 0,
+    }
+
+
+# ============================
+# Comparação com a base e impressão da suíte
+# ============================
+def test_comparar_com_base_de_tempo_zero():
+    avisos = comparar_com_base({"resultados": [_resultado(0.01)]}, {"resultados": [_resultado(0.0)]})
+    assert len(avisos) == 1 and "base 0 s" in avisos[0]
+    assert comparar_com_base({"resultados": [_resultado(0.0)]}, {"resultados": [_resultado(0.0)]}) == []
+
+
+def test_comparar_com_base_aponta_regressoes():
+    avisos = comparar_com_base({"resultados": [_resultado(0.5, passos=101, memoria=10**6)]},
+                               {"resultados": [_resultado(0.25)]})
+    assert len(avisos) == 3
+    assert "+100%" in avisos[1]
+
+
+def test_imprimir_suite_com_tempo_zero(capsys):
+    imprimir_suite({"resultados": [_resultado(0.0), _resultado(0.5)]})
+    linhas = capsys.readouterr().out.splitlines()
+    assert len(linhas) == 3
+    assert linhas[1].split()[5] == "-"
+    assert linhas[2].split()[5] == "200"
+
+
+def test_medir_escalabilidade_conta_os_passos():
+    for n_linhas, tempo_compilacao, passos, taxa in medir_escalabilidade([10, 100], passos_alvo=2_000):
+        assert passos == passos_programa_linear(n_linhas, max(1, 2_000 // n_linhas))
+        assert tempo_compilacao >= 0 and taxa > 0
@@ -0,0 +1,142 @@
+import pytest
+
+from norma import BancoRegistradores, Biblioteca, CacheProgramas, Execucao, MemoMacros, executar, obter_biblioteca
+
+
+def _rodar(programas, valores, arquivo="x.txt"):
+    regs = BancoRegistradores(valores)
+    executar(programas, regs, arquivo)
+    return regs.valores
+
+
+# ============================
+# Cache de bibliotecas compiladas
+# ============================
+def test_linha_editada_no_proprio_dict_recompila():
+    programas = {"x.txt": {1: "add_a", 2: "add_a"}}
+    assert _rodar(programas, [0]) == [2]
+    programas["x.txt"][2] = "sub_a"
+    assert _rodar(programas, [0]) == [0]
+
+
+def test_macro_editada_no_proprio_dict_recompila_quem_chama():
+    programas = {"x.txt": {1: "m_y"}, "y.txt": {1: "add_a"}}
+    assert _rodar(programas, [0]) == [1]
+    programas["y.txt"][1] = "add_b"
+    assert _rodar(programas, [0, 0]) == [0, 1]
+    programas["y.txt"][2] = "add_b"
+    assert _rodar(programas, [0, 0]) == [0, 2]
+
+
+def test_macro_ausente_que_passa_a_existir():
+    programas = {"x.txt": {1: "m_y add_a"}}
+    assert _rodar(programas, [0, 0]) == [0, 0]
+    programas["y.txt"] = {1: "add_b"}
+    assert _rodar(programas, [0, 0]) == [1, 1]
+
+
+def test_biblioteca_reaproveitada_sem_mudancas():
+    programas = {"x.txt": {1: "add_a"}}
+    bib = obter_biblioteca(programas, 1)
+    bib.id_de("x.txt")
+    assert obter_biblioteca(programas, 1) is bib
+    assert bib.atualizada(programas)
+    assert not bib.atualizada({"x.txt": {1: "add_a"}})   # outro dict, mesmo conteúdo
+
+
+def test_fontes_sao_copias():
+    programas = {"x.txt": {1: "add_a"}}
+    bib = Biblioteca(programas, 1)
+    bib.id_de("x.txt")
+    programas["x.txt"][1] = "sub_a"
+    assert bib.fontes[0] == {1: "add_a"}
+    assert not bib.atualizada(programas)
+
+
+# ============================
+# Cache de programas lidos da pasta
+# ============================
+def test_arquivo_invalido_falha_em_todas_as_cargas(tmp_path):
+    (tmp_path / "x.txt").write_text("1: m_y\n", encoding="utf-8")
+    (tmp_path / "y.txt").write_text("1: add_a\n2: add_a\n", encoding="utf-8")
+    cache = CacheProgramas(str(tmp_path))
+    programas = cache.carregar()
+    assert _rodar(programas, [0, 0]) == [2, 0]
+
+    (tmp_path / "y.txt").write_text("1: add_b\n", encoding="utf-8")
+    (tmp_path / "z.txt").write_text("um: add_a\n", encoding="utf-8")
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            cache.carregar()
+    # se y.txt foi relido antes da falha, quem o chama também é recompilado
+    assert _rodar(programas, [0, 0]) == ([0, 1] if programas["y.txt"] == {1: "add_b"} else [2, 0])
+
+    (tmp_path / "z.txt").write_bytes(b"1: add_\xff\n")
+    with pytest.raises(UnicodeDecodeError):
+        cache.carregar()
+    with pytest.raises(UnicodeDecodeError):
+        cache.carregar()
+
+    (tmp_path / "z.txt").write_text("1: add_a\n", encoding="utf-8")
+    cache.carregar()
+    assert "z.txt" in cache.alterados
+    assert programas["z.txt"] == {1: "add_a"}
+    assert _rodar(programas, [0, 0]) == [0, 1]
+
+
+# ============================
+# Memoização de macros
+# ============================
+def test_memo_conta_acertos_e_falhas():
+    memo = MemoMacros(4)
+    assert memo.buscar((0, (1,)), 100) is None
+    memo.guardar((0, (1,)), (2,), 10)
+    assert memo.buscar((0, (1,)), 100) == ((2,), 10)
+    assert memo.buscar((0, (1,)), 9) is None      # não cabe no que resta do limite
+    assert (memo.acertos, memo.falhas) == (1, 2)
+    memo.limpar()
+    assert (len(memo), memo.acertos, memo.falhas) == (0, 0, 0)
+
+
+def test_memo_descarta_a_menos_usada_ao_encher():
+    memo = MemoMacros(3)
+    for i in range(3):
+        memo.guardar((0, (i,)), (i,), 1)
+    assert memo.buscar((0, (0,)), 10) is not None     # 0 passa a ser a mais recente
+    memo.guardar((0, (3,)), (3,), 1)
+    assert len(memo) == 3
+    assert memo.buscar((0, (1,)), 10) is None          # a menos usada saiu
+    assert all(memo.buscar((0, (i,)), 10) is not None for i in (0, 2, 3))
+
+
+def test_memo_na_execucao(programas):
+    # pot.txt chama multi.txt b vezes; com a mesma base, as chamadas se repetem entre execuções
+    bib = Biblioteca(programas, 7)
+    primeira = Execucao(bib, "pot.txt", [3, 4, 0, 0, 0, 0, 0])
+    primeira.rodar()
+    acertos = bib.memo.acertos
+    segunda = Execucao(bib, "pot.txt", [3, 4, 0, 0, 0, 0, 0])
+    segunda.rodar()
+    assert bib.memo.acertos > acertos
+    assert (segunda.valores, segunda.passos) == (primeira.valores, primeira.passos)
+    assert segunda.iteracoes < primeira.iteracoes
+
+    bib.memo.capacidade = 2
+    Execucao(bib, "pot.txt", [2, 9, 0, 0, 0, 0, 0]).rodar()
+    assert len(bib.memo) <= 2
+
+
+@pytest.mark.parametrize("arquivo", ["pot.txt", "multi.txt", "maior_a_b.txt", "exemplomacro.txt", "main.txt"])
+@pytest.mark.parametrize("acelerar", [True, False])
+def test_sem_memo_da_os_mesmos_registradores_e_passos(programas, arquivo, acelerar):
+    bib = Biblioteca(programas, 7)
+    for a in range(5):
+        for b in range(5):
+            com = Execucao(bib, arquivo, [a, b, 0, 0, 0, 0, 0])
+            com.rodar(acelerar=acelerar)
+            sem = Execucao(Biblioteca(programas, 7), arquivo, [a, b, 0, 0, 0, 0, 0])
+            sem.rodar(acelerar=acelerar, memoizar=False)
+            assert (com.valores, com.passos) == (sem.valores, sem.passos)
+    vazia = Biblioteca(programas, 7)
+    Execucao(vazia, "pot.txt", [3, 4, 0, 0, 0, 0, 0]).rodar(memoizar=False)
+    assert (len(vazia.memo), vazia.memo.acertos, vazia.memo.falhas) == (0, 0, 0)
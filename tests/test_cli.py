@@ -0,0 +1,47 @@
+import io
+import json
+
+from cli import criar_parser, executar_entradas
+
+
+class _SaidaContada(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.descargas = 0
+
+    def flush(self):
+        self.descargas += 1
+        super().flush()
+
+
+def test_fluxo_emite_cada_resultado_antes_da_proxima_entrada(programas):
+    opcoes = criar_parser().parse_args(["pot.txt"])
+    saida = _SaidaContada()
+
+    def vetores():
+        for i in range(5):
+            # a entrada anterior já precisa estar escrita e descarregada
+            assert saida.getvalue().count("\n") == i
+            assert saida.descargas == i
+            yield [2, i]
+
+    assert executar_entradas(programas, opcoes, vetores(), saida) == 0
+    resultados = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+    assert [r["indice"] for r in resultados] == list(range(5))
+    assert [r["regs"][0] for r in resultados] == [2 ** i for i in range(5)]
+
+
+def test_erro_de_entrada_nao_interrompe_as_demais(programas):
+    opcoes = criar_parser().parse_args(["multi.txt", "--n-regs", "2"])
+    saida = io.StringIO()
+    assert executar_entradas(programas, opcoes, iter([[1, 2, 3], [1, 2]]), saida) == 1
+    primeiro, segundo = (json.loads(linha) for linha in saida.getvalue().splitlines())
+    assert "erro" in primeiro and "erro" not in segundo
+
+
+def test_varios_processos(programas):
+    opcoes = criar_parser().parse_args(["pot.txt", "--jobs", "2", "--tamanho-bloco", "1"])
+    saida = io.StringIO()
+    assert executar_entradas(programas, opcoes, iter([[2, 3], [3, 2], [0, 0]]), saida) == 0
+    resultados = sorted((json.loads(linha) for linha in saida.getvalue().splitlines()), key=lambda r: r["indice"])
+    assert [r["regs"][0] for r in resultados] == [8, 9, 1]
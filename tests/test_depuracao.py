@@ -0,0 +1,83 @@
+import shutil
+
+import pytest
+
+from conftest import RAIZ
+from depuracao import Depurador
+from norma import BancoRegistradores, CacheProgramas, rastrear
+
+
+def _referencia(programas, arquivo, valores):
+    # estado antes de cada passo (arquivo, linha, regs) e os registradores finais
+    regs = BancoRegistradores(list(valores))
+    estados = [(p.arquivo, p.linha, p.regs) for p in rastrear(programas, regs, arquivo, None) if p.tipo == "STATE"]
+    return estados, tuple(regs.valores)
+
+
+# ============================
+# Reconstrução de passos anteriores
+# ============================
+@pytest.mark.parametrize("intervalo,maximo", [(1, 2), (7, 3), (50, 1024)])
+def test_ir_para_reconstroi_cada_passo(programas, intervalo, maximo):
+    valores = [2, 3, 0, 0, 0, 0, 0]
+    estados, final = _referencia(programas, "pot.txt", valores)
+    dep = Depurador(programas, "pot.txt", valores, intervalo, maximo)
+    assert dep.continuar().regs == final
+    assert len(dep.instantaneos) <= max(2, maximo)
+    for passo in list(range(len(estados) - 1, -1, -37)) + [0, 5, len(estados)]:
+        m = dep.ir_para(passo)
+        if passo == len(estados):
+            assert m.concluida and m.regs == final
+        else:
+            assert (m.arquivo, m.linha, m.regs) == estados[passo] and not m.concluida
+
+
+def test_voltar_ate_linha_e_ultima_mudanca(programas):
+    valores = [2, 3, 0, 0, 0, 0, 0]
+    estados, _ = _referencia(programas, "pot.txt", valores)
+    dep = Depurador(programas, "pot.txt", valores, intervalo=10)
+    dep.ir_para(200)
+    esperado = max(i for i in range(200) if estados[i][:2] == ("multi.txt", 3))
+    assert dep.voltar_ate_linha("multi.txt", 3).passo == esperado
+
+    for r in range(7):
+        mudancas = [i for i in range(1, esperado + 1) if estados[i][2][r] != estados[i - 1][2][r]]
+        mudanca = dep.ultima_mudanca(r)
+        if not mudancas:
+            assert mudanca is None
+        else:
+            i = mudancas[-1]
+            assert (mudanca.passo, mudanca.arquivo, mudanca.linha) == (i, *estados[i - 1][:2])
+            assert (mudanca.antes, mudanca.depois) == (estados[i - 1][2][r], estados[i][2][r])
+    assert dep.passo == esperado
+
+
+def test_programas_recarregados_nao_afetam_a_sessao(tmp_path):
+    pasta = tmp_path / "macros"
+    shutil.copytree(f"{RAIZ}/macros", pasta)
+    cache = CacheProgramas(str(pasta))
+    programas = cache.carregar()
+    valores = [2, 3, 0, 0, 0, 0, 0]
+    estados, final = _referencia(programas, "pot.txt", valores)
+    dep = Depurador(programas, "pot.txt", valores, intervalo=10)
+    dep.continuar()
+
+    (pasta / "pot.txt").write_text("1: add_a\n", encoding="utf-8")
+    (pasta / "multi.txt").write_text("1: add_a\n", encoding="utf-8")
+    cache.carregar()
+    assert sorted(cache.alterados) == ["multi.txt", "pot.txt"]
+
+    m = dep.voltar(3)
+    assert (m.arquivo, m.linha, m.regs) == estados[-3]
+    assert dep.voltar_ate_linha("pot.txt", 12) is not None
+    assert dep.continuar().regs == final
+
+
+def test_instantaneos_reaproveitam_os_vetores_descartados(programas):
+    dep = Depurador(programas, "pot.txt", [3, 4, 0, 0, 0, 0, 0], intervalo=5, max_instantaneos=4)
+    vetor = dep.ex.valores
+    dep.continuar()
+    vetores = {id(i.valores) for i in dep.instantaneos}
+    assert len(dep._livres) + len(vetores) <= dep.max_instantaneos + 1
+    dep.ir_para(3)
+    assert dep.ex.valores is vetor is dep.regs.valores
@@ -0,0 +1,37 @@
+from norma import BancoRegistradores, executar, executar_com_logs
+
+PROGRAMAS = {
+    "principal.txt": {1: "m_infinito", 2: "add_b"},
+    "infinito.txt": {1: "add_c", 2: "va_para 1"},
+}
+
+
+def _tipos(log):
+    return [linha.split("|", 1)[0] for linha in log]
+
+
+# ============================
+# Limite de passos do log: por chamada, como no interpretador original
+# ============================
+def test_limite_vale_para_cada_chamada(programas):
+    # pot.txt com a=5, b=3 passa de 1001 linhas no total, mas não em nenhuma chamada
+    esperado = BancoRegistradores([5, 3, 0, 0, 0, 0, 0])
+    executar(programas, esperado, "pot.txt")
+    regs, log = executar_com_logs(programas, BancoRegistradores([5, 3, 0, 0, 0, 0, 0]), "pot.txt")
+    assert _tipos(log).count("STATE") > 1001
+    assert "ERROR" not in _tipos(log)
+    assert regs.valores == esperado.valores == [125, 5, 0, 0, 5, 0, 0]
+
+
+def test_erro_numa_macro_volta_para_quem_chamou():
+    regs, log = executar_com_logs(PROGRAMAS, BancoRegistradores([0, 0, 0]), "principal.txt")
+    assert _tipos(log)[-3:] == ["ERROR", "STATE", "INFO"]
+    assert _tipos(log).count("STATE") == 1 + 1001 + 1
+    assert regs.valores == [0, 1, 501]
+
+
+def test_limite_da_execucao_inteira():
+    regs, log = executar_com_logs(PROGRAMAS, BancoRegistradores([0, 0, 0]), "principal.txt",
+                                  limite_passos=10, limite_por_macro=False)
+    assert _tipos(log) == ["STATE"] * 10 + ["ERROR"]
+    assert regs.valores == [0, 0, 5]
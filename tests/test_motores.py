@@ -0,0 +1,124 @@
+import pytest
+
+import transpilar
+from benchmark import executar_por_texto, gerar_cadeia_macros, gerar_programa_linear
+from lote import executar_lote
+from norma import BancoRegistradores, Execucao, Registrador, executar, executar_com_logs, obter_biblioteca, rastrear
+
+N_REGS = 7
+
+
+def _casos():
+    from conftest import RAIZ
+    from norma import ler_programas
+    macros = ler_programas(f"{RAIZ}/macros")
+    casos = []
+    for arquivo in ("maior_a_b.txt", "menor_a_b.txt", "multi.txt", "exemplomacro.txt"):
+        casos += [(macros, arquivo, [a, b]) for a in range(6) for b in range(6)]
+    casos += [(macros, "pot.txt", [a, b]) for a in range(4) for b in range(4)]
+    casos += [(macros, "main.txt", [a, b]) for a in range(3) for b in range(3)]
+    sintetico = {"linear.txt": gerar_programa_linear(40)}
+    casos += [(sintetico, "linear.txt", [a]) for a in (0, 1, 5)]
+    casos += [(gerar_cadeia_macros(30), "cadeia0.txt", [0, 0])]
+    return casos
+
+
+CASOS = _casos()
+IDS = [f"{arquivo}-{'-'.join(map(str, valores))}" for _, arquivo, valores in CASOS]
+
+
+def _vetor(valores):
+    return list(valores) + [0] * (N_REGS - len(valores))
+
+
+@pytest.fixture(scope="module")
+def referencias():
+    # o interpretador passo a passo que relê o texto: registradores finais e passos
+    saida = {}
+    for programas, arquivo, valores in CASOS:
+        v = _vetor(valores)
+        passos = executar_por_texto(programas, v, arquivo)
+        saida[arquivo, tuple(valores)] = (v, passos)
+    return saida
+
+
+# ============================
+# Cada motor contra o interpretador de referência
+# ============================
+@pytest.mark.parametrize("programas,arquivo,valores", CASOS, ids=IDS)
+@pytest.mark.parametrize("acelerar", [True, False])
+@pytest.mark.parametrize("memoizar", [True, False])
+def test_execucao(referencias, programas, arquivo, valores, acelerar, memoizar):
+    esperado, passos = referencias[arquivo, tuple(valores)]
+    ex = Execucao(obter_biblioteca(programas, N_REGS), arquivo, _vetor(valores))
+    ex.rodar(acelerar=acelerar, memoizar=memoizar)
+    assert (ex.valores, ex.passos, ex.concluida) == (esperado, passos, True)
+
+
+@pytest.mark.parametrize("programas,arquivo,valores", CASOS, ids=IDS)
+def test_execucao_em_fatias(referencias, programas, arquivo, valores):
+    esperado, passos = referencias[arquivo, tuple(valores)]
+    ex = Execucao(obter_biblioteca(programas, N_REGS), arquivo, _vetor(valores))
+    while not ex.concluida:
+        antes = ex.passos
+        ex.rodar(7)
+        assert ex.passos == antes + 7 or ex.concluida
+    assert (ex.valores, ex.passos) == (esperado, passos)
+
+
+@pytest.mark.parametrize("programas,arquivo,valores", CASOS, ids=IDS)
+def test_executar(referencias, programas, arquivo, valores):
+    esperado, _ = referencias[arquivo, tuple(valores)]
+    banco = BancoRegistradores(_vetor(valores))
+    executar(programas, banco, arquivo)
+    assert banco.valores == esperado
+    lista = [Registrador(chr(ord("a") + i), v) for i, v in enumerate(_vetor(valores))]
+    executar(programas, lista, arquivo, acelerar=False)
+    assert [r.valor for r in lista] == esperado
+
+
+@pytest.mark.parametrize("programas,arquivo,valores", CASOS, ids=IDS)
+@pytest.mark.parametrize("acelerar", [True, False])
+def test_transpilado(referencias, programas, arquivo, valores, acelerar, tmp_path):
+    esperado, passos = referencias[arquivo, tuple(valores)]
+    v = _vetor(valores)
+    funcao = transpilar.transpilar(obter_biblioteca(programas, N_REGS), arquivo, acelerar, pasta_cache=str(tmp_path))
+    assert funcao(v, 0) == passos
+    assert v == esperado
+
+
+@pytest.mark.parametrize("programas,arquivo,valores", CASOS, ids=IDS)
+def test_rastrear_e_logs(referencias, programas, arquivo, valores):
+    esperado, passos = referencias[arquivo, tuple(valores)]
+    regs = BancoRegistradores(_vetor(valores))
+    tipos = [p.tipo for p in rastrear(programas, regs, arquivo, None)]
+    assert (regs.valores, tipos.count("STATE"), tipos[-1]) == (esperado, passos, "INFO")
+
+    regs = BancoRegistradores(_vetor(valores))
+    _, log = executar_com_logs(programas, regs, arquivo, limite_passos=None)
+    assert regs.valores == esperado
+    assert sum(linha.startswith("STATE|") for linha in log) == passos
+
+
+@pytest.mark.parametrize("acelerar", [True, False])
+def test_lote(referencias, acelerar):
+    for programas, arquivo in {(id(p), a): (p, a) for p, a, _ in CASOS}.values():
+        entradas = [valores for p, a, valores in CASOS if p is programas and a == arquivo]
+        resultado = executar_lote(programas, arquivo, entradas, N_REGS, trabalhadores=1, tamanho_bloco=5, acelerar=acelerar)
+        for i, valores in enumerate(entradas):
+            esperado, passos = referencias[arquivo, tuple(valores)]
+            assert (list(resultado.linha(i)), resultado.passos[i], resultado.concluidos[i]) == (esperado, passos, 1)
+
+
+@pytest.mark.parametrize("acelerar", [True, False])
+def test_vetorizado(referencias, acelerar):
+    pytest.importorskip("numpy")
+    from vetorizado import executar_vetorizado
+    for programas, arquivo in {(id(p), a): (p, a) for p, a, _ in CASOS}.values():
+        entradas = [valores for p, a, valores in CASOS if p is programas and a == arquivo]
+        for minimo_ativos in (0, 10**6):
+            regs, passos, concluidos = executar_vetorizado(programas, arquivo, entradas, N_REGS,
+                                                           acelerar=acelerar, minimo_ativos=minimo_ativos)
+            for i, valores in enumerate(entradas):
+                esperado, n = referencias[arquivo, tuple(valores)]
+                assert (regs[i].tolist(), int(passos[i]), bool(concluidos[i])) == (esperado, n, True)
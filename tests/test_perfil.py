@@ -0,0 +1,60 @@
+import pytest
+
+from norma import BancoRegistradores, Biblioteca, Execucao, Perfil
+from perfil import linhas_quentes, perfilar, pilhas_colapsadas, resumo_macros
+
+CASOS = [
+    ("pot.txt", [3, 4]),
+    ("pot.txt", [2, 6]),
+    ("multi.txt", [7, 9]),
+    ("maior_a_b.txt", [5, 3]),
+    ("exemplomacro.txt", [4, 3]),   # recursiva
+    ("main.txt", [2, 2]),
+]
+
+
+def _vetor(valores):
+    return valores + [0] * (7 - len(valores))
+
+
+def _perfil(programas, arquivo, valores, acelerar):
+    # biblioteca própria: um perfil não pode ser vinculado a duas bibliotecas
+    perfil = Perfil()
+    ex = Execucao(Biblioteca(programas, 7), arquivo, _vetor(valores))
+    ex.rodar(acelerar=acelerar, perfil=perfil)
+    return perfil, ex
+
+
+# ============================
+# Contagens independem da aceleração
+# ============================
+@pytest.mark.parametrize("arquivo,valores", CASOS)
+def test_contagens_iguais_com_e_sem_aceleracao(programas, arquivo, valores):
+    acelerado, ex_a = _perfil(programas, arquivo, valores, True)
+    passo_a_passo, ex_p = _perfil(programas, arquivo, valores, False)
+    assert (ex_a.valores, ex_a.passos) == (ex_p.valores, ex_p.passos)
+    if arquivo == "pot.txt":
+        assert ex_a.iteracoes < ex_p.iteracoes     # os laços foram mesmo acelerados
+    assert sorted(linhas_quentes(acelerado)) == sorted(linhas_quentes(passo_a_passo))
+    assert sorted(resumo_macros(acelerado)) == sorted(resumo_macros(passo_a_passo))
+    assert sorted(pilhas_colapsadas(acelerado)) == sorted(pilhas_colapsadas(passo_a_passo))
+
+
+@pytest.mark.parametrize("arquivo,valores", CASOS)
+@pytest.mark.parametrize("acelerar", [True, False])
+def test_passos_exclusivos_somam_os_passos(programas, arquivo, valores, acelerar):
+    perfil, ex = _perfil(programas, arquivo, valores, acelerar)
+    assert sum(exclusivos for _, _, exclusivos, _ in resumo_macros(perfil)) == ex.passos
+    assert sum(n for _, _, n in linhas_quentes(perfil)) == ex.passos
+    assert sum(perfil.no_passos) == ex.passos
+    entrada = next(r for r in resumo_macros(perfil) if r[0] == arquivo)
+    assert entrada[3] == ex.passos      # inclusivos do programa de entrada
+
+
+def test_perfilar_acumula_execucoes(programas):
+    perfil = perfilar(programas, BancoRegistradores(_vetor([3, 4])), "pot.txt")
+    perfilar(programas, BancoRegistradores(_vetor([3, 4])), "pot.txt", perfil=perfil)
+    unico, ex = _perfil(programas, "pot.txt", [3, 4], True)
+    dobro = {(arq, ln): 2 * n for arq, ln, n in linhas_quentes(unico)}
+    assert {(arq, ln): n for arq, ln, n in linhas_quentes(perfil)} == dobro
+    assert sum(perfil.no_passos) == 2 * ex.passos
@@ -0,0 +1,134 @@
+import csv
+import json
+import random
+
+import pytest
+
+from norma import BancoRegistradores, Passo, executar_com_logs, formatar_passo, rastrear
+from rastro import GravadorBinario, LeitorBinario, SinkAnel, SinkArquivo, SinkContador, SinkLista, gravar_rastro
+
+
+def _passos_da_execucao(programas, arquivo, valores):
+    return list(rastrear(programas, BancoRegistradores(valores), arquivo, None))
+
+
+def _gravar(caminho, passos, n_regs, intervalo_chave, tamanho_bloco=1 << 16):
+    gravar_rastro(iter(passos), GravadorBinario(str(caminho), n_regs, intervalo_chave, tamanho_bloco))
+
+
+# ============================
+# Destinos em memória e em arquivo
+# ============================
+@pytest.mark.parametrize("k", [1, 5, 100, 10_000])
+def test_anel_guarda_so_os_ultimos_k(programas, k):
+    todos, anel, contador = SinkLista(), SinkAnel(k), SinkContador()
+    gravar_rastro(rastrear(programas, BancoRegistradores([3, 4, 0, 0, 0, 0, 0]), "pot.txt", None),
+                  todos, anel, contador)
+    assert list(anel.passos) == todos.passos[-k:]
+    assert len(anel.passos) == min(k, len(todos.passos))
+    assert contador.total == len(todos.passos)
+    assert contador.estados == sum(p.tipo == "STATE" for p in todos.passos)
+
+
+def _ler_arquivo(caminho, formato):
+    with open(caminho, encoding="utf-8", newline="") as f:
+        if formato == "jsonl":
+            return [Passo(**{**d, "regs": tuple(d["regs"])}) for d in map(json.loads, f)]
+        linhas = list(csv.reader(f))
+    assert linhas[0] == ["tipo", "arquivo", "linha", "regs"]
+    return [Passo(t, a, int(ln), tuple(map(int, r.split()))) for t, a, ln, r in linhas[1:]]
+
+
+@pytest.mark.parametrize("formato", ["jsonl", "csv"])
+@pytest.mark.parametrize("arquivo,valores,limite", [
+    ("pot.txt", [2, 3, 0, 0, 0, 0, 0], 1000),
+    ("multi.txt", [20, 30, 0, 0, 0, 0, 0], 1000),   # estoura o limite: termina em ERROR
+    ("exemplomacro.txt", [3, 2, 0, 0, 0, 0, 0], 50),
+])
+def test_arquivo_igual_a_executar_com_logs(programas, tmp_path, formato, arquivo, valores, limite):
+    caminho = tmp_path / f"rastro.{formato}"
+    gravar_rastro(rastrear(programas, BancoRegistradores(valores), arquivo, limite),
+                  SinkArquivo(str(caminho), formato, tamanho_bloco=16))
+    _, log = executar_com_logs(programas, BancoRegistradores(valores), arquivo,
+                               limite_passos=limite, limite_por_macro=False)
+    nomes = [chr(ord("a") + i) for i in range(len(valores))]
+    assert [formatar_passo(p, programas, nomes) for p in _ler_arquivo(caminho, formato)] == log
+
+
+def test_formato_desconhecido(tmp_path):
+    with pytest.raises(ValueError):
+        SinkArquivo(str(tmp_path / "x.txt"), "xml")
+
+
+# ============================
+# Rastro binário: ida e volta
+# ============================
+@pytest.mark.parametrize("intervalo_chave", [1, 2, 7, 1024])
+def test_acesso_direto_igual_a_leitura_linear(programas, tmp_path, intervalo_chave):
+    passos = _passos_da_execucao(programas, "pot.txt", [3, 4, 0, 0, 0, 0, 0])
+    caminho = tmp_path / "pot.bin"
+    _gravar(caminho, passos, 7, intervalo_chave, tamanho_bloco=64)
+    with LeitorBinario(str(caminho)) as leitor:
+        assert len(leitor) == len(passos)
+        linear = list(leitor)
+        assert linear == passos
+        sorteados = random.Random(1).sample(range(len(passos)), 200)
+        for k in sorteados + [0, len(passos) - 1, -1]:
+            assert leitor[k] == linear[k]
+        with pytest.raises(IndexError):
+            leitor[len(passos)]
+
+
+def test_bordas_dos_quadros_chave(tmp_path):
+    intervalo = 8
+    rng = random.Random(7)
+    regs = [0, 0, 0]
+    passos = []
+    for i in range(5 * intervalo + 1):
+        regs[rng.randrange(3)] += rng.choice([-1, 1, 5])
+        regs = [max(0, v) for v in regs]
+        passos.append(Passo("STATE", f"p{i % 3}.txt", i, tuple(regs)))
+    caminho = tmp_path / "bordas.bin"
+    _gravar(caminho, passos, 3, intervalo)
+    with LeitorBinario(str(caminho)) as leitor:
+        assert len(leitor.chaves) == 6
+        for k in range(len(passos)):
+            if k % intervalo in (0, 1, intervalo - 1):
+                assert leitor[k] == passos[k]
+
+
+def test_valores_acima_de_2_64(tmp_path):
+    grande = 2**64
+    passos = [
+        Passo("STATE", "x.txt", 1, (grande, 0)),
+        Passo("STATE", "x.txt", 2, (grande + 1, 3)),
+        Passo("STATE", "x.txt", 3, (0, 2**200)),          # delta negativo enorme
+        Passo("STATE", "x.txt", 4, (2**130 + 7, 2**200)),
+        Passo("INFO", "x.txt", 4, (2**130 + 7, 0)),
+    ]
+    caminho = tmp_path / "grande.bin"
+    _gravar(caminho, passos, 2, 3)
+    with LeitorBinario(str(caminho)) as leitor:
+        assert list(leitor) == passos
+        assert [leitor[k] for k in range(len(passos))] == passos
+
+
+def test_rastro_vazio(tmp_path):
+    caminho = tmp_path / "vazio.bin"
+    _gravar(caminho, [], 4, 16)
+    with LeitorBinario(str(caminho)) as leitor:
+        assert len(leitor) == 0
+        assert list(leitor) == []
+        assert leitor.n_regs == 4
+        with pytest.raises(IndexError):
+            leitor[0]
+
+
+def test_gravador_nao_fechado_e_recusado(tmp_path):
+    caminho = tmp_path / "aberto.bin"
+    gravador = GravadorBinario(str(caminho), 1, 4)
+    gravador(Passo("STATE", "x.txt", 1, (1,)))
+    gravador.descarregar()
+    with pytest.raises(ValueError):
+        LeitorBinario(str(caminho))
+    gravador.fechar()
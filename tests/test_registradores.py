@@ -0,0 +1,56 @@
+from norma import BancoRegistradores, Registrador
+
+
+# ============================
+# Banco de registradores: instantâneo e restauração no lugar
+# ============================
+def test_instantaneo_e_restaurar_sem_novos_vetores():
+    banco = BancoRegistradores([1, 2, 3])
+    vetor = banco.valores
+    destino = [0, 0, 0]
+    assert banco.instantaneo(destino) is destino and destino == [1, 2, 3]
+    assert banco.instantaneo() == [1, 2, 3] and banco.instantaneo() is not vetor
+
+    banco[0].inc()
+    banco[2].dec()
+    assert destino == [1, 2, 3]
+    banco.restaurar(destino)
+    assert banco.valores is vetor and vetor == [1, 2, 3]
+    assert banco[0].valor == 1
+
+
+# ============================
+# Operações em bloco: o mesmo que n inc()/dec() seguidos
+# ============================
+def _repetir(metodo, n):
+    for _ in range(n):
+        metodo()
+
+
+def test_somar_e_subtrair_equivalem_a_inc_e_dec():
+    for inicial in (0, 1, 5, 2**70):
+        for n in (0, 1, 3, 7):
+            bloco, passo = Registrador("a", inicial), Registrador("a", inicial)
+            bloco.somar(n)
+            _repetir(passo.inc, n)
+            assert bloco.valor == passo.valor
+            bloco.subtrair(n + 2)
+            _repetir(passo.dec, n + 2)
+            assert bloco.valor == passo.valor
+
+
+def test_zerar_e_transferir_numa_visao_do_banco():
+    banco = BancoRegistradores([4, 1, 2])
+    a, b, c = banco
+    a.transferir(b, c, fator=3)
+    assert banco.valores == [0, 13, 14]
+
+    # o mesmo, com o laço "enquanto a > 0: sub_a; 3 x add_b; 3 x add_c"
+    passo = BancoRegistradores([4, 1, 2])
+    pa, pb, pc = passo
+    while not pa.zero():
+        pa.dec()
+        _repetir(pb.inc, 3)
+        _repetir(pc.inc, 3)
+    assert passo.valores == banco.valores
+    assert c.zerar() == 14 and banco.valores == [0, 13, 0]
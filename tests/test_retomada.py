@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from norma import Biblioteca, Execucao
+from retomada import carregar_estado, rodar_com_retomada, salvar_estado
+
+VALORES = [3, 4, 0, 0, 0, 0, 0]
+
+
+def _sem_interrupcao(programas, arquivo, valores, acelerar=True):
+    ex = Execucao(Biblioteca(programas, len(valores)), arquivo, list(valores))
+    ex.rodar(acelerar=acelerar)
+    return ex
+
+
+# ============================
+# Fatias com ida e volta por JSON
+# ============================
+@pytest.mark.parametrize("arquivo", ["pot.txt", "multi.txt", "maior_a_b.txt", "exemplomacro.txt"])
+@pytest.mark.parametrize("fatia", [1, 7, 97])
+@pytest.mark.parametrize("acelerar", [True, False])
+def test_fatias_com_json_igual_a_execucao_inteira(programas, arquivo, fatia, acelerar):
+    esperado = _sem_interrupcao(programas, arquivo, VALORES, acelerar)
+    ex = Execucao(Biblioteca(programas, len(VALORES)), arquivo, list(VALORES))
+    fatias = 0
+    while not ex.concluida:
+        ex.rodar(fatia, acelerar=acelerar)
+        texto = json.dumps(ex.estado())
+        # cada fatia continua numa biblioteca nova, como em outro processo
+        ex = Execucao.de_estado(Biblioteca(programas, len(VALORES)), json.loads(texto))
+        fatias += 1
+    assert (ex.valores, ex.passos) == (esperado.valores, esperado.passos)
+    assert fatias >= -(-esperado.passos // fatia)   # rodar(fatia) para exatamente no limite
+
+
+def test_rodar_com_retomada_por_arquivo(programas, tmp_path):
+    esperado = _sem_interrupcao(programas, "pot.txt", VALORES)
+    caminho = str(tmp_path / "estado.json")
+    rodadas = 0
+    while True:
+        ex = rodar_com_retomada(programas, "pot.txt", VALORES, caminho, limite_passos=50)
+        rodadas += 1
+        if ex.concluida:
+            break
+    assert rodadas > 1
+    assert (ex.valores, ex.passos) == (esperado.valores, esperado.passos)
+
+
+# ============================
+# Programas alterados desde o estado salvo
+# ============================
+def _estado_no_meio(programas, caminho):
+    ex = Execucao(Biblioteca(programas, len(VALORES)), "pot.txt", list(VALORES))
+    while not ex.pilha:                         # para dentro de multi.txt
+        ex.rodar(1, acelerar=False, memoizar=False)
+    assert not ex.concluida
+    salvar_estado(ex, caminho)
+
+
+@pytest.mark.parametrize("alterado", ["pot.txt", "multi.txt"])
+def test_retomada_recusada_se_o_programa_mudou(programas, tmp_path, alterado):
+    caminho = str(tmp_path / "estado.json")
+    _estado_no_meio(programas, caminho)
+    editados = {nome: dict(prog) for nome, prog in programas.items()}
+    editados[alterado][max(editados[alterado])] += " add_g"
+    with pytest.raises(ValueError, match="mudaram"):
+        carregar_estado(caminho, editados)
+    with pytest.raises(ValueError, match="mudaram"):
+        rodar_com_retomada(editados, "pot.txt", VALORES, caminho)
+
+
+def test_mudanca_fora_do_alcance_nao_impede_a_retomada(programas, tmp_path):
+    caminho = str(tmp_path / "estado.json")
+    _estado_no_meio(programas, caminho)
+    editados = {nome: dict(prog) for nome, prog in programas.items()}
+    editados["menor_a_b.txt"][min(editados["menor_a_b.txt"])] += " add_g"
+    ex = carregar_estado(caminho, editados)
+    ex.rodar()
+    esperado = _sem_interrupcao(programas, "pot.txt", VALORES)
+    assert (ex.valores, ex.passos) == (esperado.valores, esperado.passos)
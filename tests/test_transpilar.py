@@ -0,0 +1,63 @@
+import sys
+
+import pytest
+
+import transpilar
+from benchmark import gerar_cadeia_macros
+from norma import BancoRegistradores, Biblioteca, executar, obter_biblioteca
+
+
+# ============================
+# Cadeias de macros mais fundas que a pilha do Python
+# ============================
+@pytest.mark.parametrize("profundidade", [transpilar.LIMITE_CHAMADAS, 1000, 3 * sys.getrecursionlimit()])
+def test_cadeia_profunda(profundidade, tmp_path):
+    programas = gerar_cadeia_macros(profundidade)
+    bib = Biblioteca(programas, 7)
+    _, interpretados = transpilar.gerar_fonte(bib, "cadeia0.txt")
+    if profundidade <= transpilar.LIMITE_CHAMADAS:
+        assert not interpretados
+    else:
+        assert interpretados == {f"cadeia{transpilar.LIMITE_CHAMADAS}.txt"}
+
+    valores = [0] * 7
+    passos = transpilar.transpilar(bib, "cadeia0.txt", pasta_cache=str(tmp_path))(valores, 0)
+    assert valores[1] == profundidade
+    assert passos == 2 * profundidade - 1
+
+
+def test_cadeia_profunda_pelo_executar():
+    regs = BancoRegistradores([0] * 7)
+    transpilar.executar(gerar_cadeia_macros(1000), regs, "cadeia0.txt")
+    assert regs.valores[1] == 1000
+
+
+def test_profundidade_pelo_caminho_mais_longo():
+    # "atalho" é chamado direto da raiz, mas também no fim da cadeia
+    programas = gerar_cadeia_macros(transpilar.LIMITE_CHAMADAS)
+    programas["cadeia0.txt"][3] = "m_atalho"
+    programas[f"cadeia{transpilar.LIMITE_CHAMADAS - 1}.txt"][2] = "m_atalho"
+    programas["atalho.txt"] = {1: "add_c"}
+    bib = Biblioteca(programas, 7)
+    _, interpretados = transpilar.gerar_fonte(bib, "cadeia0.txt")
+    assert interpretados == {"atalho.txt"}
+    valores = [0] * 7
+    transpilar.transpilar(bib, "cadeia0.txt", pasta_cache=None)(valores, 0)
+    assert valores[1:3] == [transpilar.LIMITE_CHAMADAS, 2]
+
+
+# ============================
+# memoizar chega ao interpretador usado pelas macros recursivas
+# ============================
+@pytest.mark.parametrize("memoizar", [True, False])
+def test_memoizar_repassado_ao_interpretador(programas, memoizar):
+    bib = obter_biblioteca(programas, 7)
+    bib.memo.limpar()
+    _, interpretados = transpilar.gerar_fonte(bib, "exemplomacro.txt")
+    assert "exemplomacro.txt" in interpretados
+    regs = BancoRegistradores([5, 3, 0, 0, 0, 0, 0])
+    transpilar.executar(programas, regs, "exemplomacro.txt", memoizar=memoizar)
+    esperado = BancoRegistradores([5, 3, 0, 0, 0, 0, 0])
+    executar(programas, esperado, "exemplomacro.txt", memoizar=False)
+    assert regs.valores == esperado.valores
+    assert (bib.memo.acertos + bib.memo.falhas > 0) == memoizar
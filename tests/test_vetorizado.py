@@ -0,0 +1,69 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from norma import Execucao, obter_biblioteca  # noqa: E402
+from vetorizado import MAXIMO_INT64, executar_vetorizado, verificar_conformidade  # noqa: E402
+
+ARQUIVOS = ["maior_a_b.txt", "menor_a_b.txt", "multi.txt", "pot.txt", "exemplomacro.txt"]
+GRADE = [[a, b] for a in range(9) for b in range(9)]
+
+
+def _grade(arquivo):
+    return [[a % 5, b % 5] for a, b in GRADE] if arquivo == "pot.txt" else GRADE
+
+
+# ============================
+# Conformidade com o interpretador escalar
+# ============================
+@pytest.mark.parametrize("arquivo", ARQUIVOS)
+@pytest.mark.parametrize("acelerar", [True, False])
+@pytest.mark.parametrize("minimo_ativos", [0, 10**6])   # sempre vetorizado / sempre entrega ao escalar
+def test_conformidade_macros(programas, arquivo, acelerar, minimo_ativos):
+    assert verificar_conformidade(programas, arquivo, _grade(arquivo),
+                                  acelerar=acelerar, minimo_ativos=minimo_ativos) == []
+
+
+@pytest.mark.parametrize("arquivo", ARQUIVOS)
+@pytest.mark.parametrize("limite", [0, 1, 7, 40])
+def test_conformidade_com_limite(programas, arquivo, limite):
+    for minimo_ativos in (0, 40):
+        assert verificar_conformidade(programas, arquivo, _grade(arquivo), limite_passos=limite,
+                                      minimo_ativos=minimo_ativos) == []
+
+
+# ============================
+# Valores que não cabem em int64
+# ============================
+GRANDES = [
+    ("multi.txt", [2**62, 4]),
+    ("multi.txt", [MAXIMO_INT64, 1]),
+    ("multi.txt", [2**64, 2]),          # entrada acima de int64
+    ("pot.txt", [2, 70]),
+    ("menor_a_b.txt", [MAXIMO_INT64, 5]),
+    ("maior_a_b.txt", [2**70, 1]),
+]
+
+
+@pytest.mark.parametrize("arquivo,entrada", GRANDES)
+@pytest.mark.parametrize("minimo_ativos", [0, 10**6])
+def test_valores_grandes(programas, arquivo, entrada, minimo_ativos):
+    entradas = [entrada, [3, 2]]
+    assert verificar_conformidade(programas, arquivo, entradas, minimo_ativos=minimo_ativos) == []
+    assert verificar_conformidade(programas, arquivo, entradas, limite_passos=50,
+                                  minimo_ativos=minimo_ativos) == []
+
+
+def test_multiplicacao_acima_de_int64(programas):
+    regs, passos, concluidos = executar_vetorizado(programas, "multi.txt", [[2**62, 4], [3, 4]], minimo_ativos=0)
+    assert regs.dtype == object
+    assert regs[0, 2] == 2**64 and regs[1, 2] == 12
+    assert concluidos.tolist() == [True, True]
+    ex = Execucao(obter_biblioteca(programas, 7), "multi.txt", [2**62, 4, 0, 0, 0, 0, 0])
+    ex.rodar()
+    assert passos[0] == ex.passos > MAXIMO_INT64
+
+
+def test_resultado_int64_quando_cabe(programas):
+    regs, passos, _ = executar_vetorizado(programas, "multi.txt", [[3, 4]])
+    assert regs.dtype == np.int64 and passos.dtype == np.int64
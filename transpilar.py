@@ -0,0 +1,306 @@
+import hashlib
+import marshal
+import os
+import sys
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from analise import componentes_recursivas
+from norma import (
+    OP_ADD, OP_SUB, OP_SE, OP_VA, OP_MACRO,
+    Biblioteca, Execucao, ProgramaCompilado, Registradores,
+    _abrir_registradores, _devolver_registradores, executar as executar_interpretado,
+    obter_biblioteca, registradores_por_programa,
+)
+
+# ======================================
+# Gerador: cada programa vira uma função Python
+# ======================================
+# Os registradores que o programa usa viram variáveis locais (r0, r1, ...) e
+# as linhas viram uma máquina de estados dentro de um "while True": cada linha
+# é um "if L == n" em ordem crescente, então seguir para a linha seguinte ou
+# saltar para frente não volta ao topo; só saltos para trás usam "continue".
+# Grupos de linhas ficam sob um "if L <= última" para que um salto para trás
+# num programa longo não percorra todas as comparações.
+# Macros recursivas (e linhas aninhadas demais) ficam com o interpretador.
+# Cada chamada de macro é uma chamada Python, então uma cadeia de macros mais
+# funda que LIMITE_CHAMADAS também passa ao interpretador, que usa pilha própria.
+VERSAO_GERADOR = 2
+LINHAS_POR_GRUPO = 32
+LIMITE_ANINHAMENTO = 80
+LIMITE_CHAMADAS = 200
+PASTA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__", "transpilado")
+
+
+class _AninhamentoExcessivo(Exception):
+    pass
+
+
+def _gerar_linha(
+    cp: ProgramaCompilado,
+    pc: int,
+    saida: List[str],
+    nivel: int,
+    posicao: Dict[int, int],
+    atual: int,
+    nomes: Dict[str, str],
+    leitura: Dict[str, Tuple[int, ...]],
+    escrita: Dict[str, Tuple[int, ...]],
+    locais: Set[int],
+    acelerar: bool,
+) -> None:
+    if nivel > LIMITE_ANINHAMENTO:
+        raise _AninhamentoExcessivo(cp.arquivo)
+    recuo = "    " * nivel
+    while True:
+        op = cp.ops[pc]
+        a = cp.args[pc]
+        if op == OP_ADD:
+            saida.append(f"{recuo}r{a} += 1")
+            pc += 1
+        elif op == OP_SUB:
+            saida.append(f"{recuo}if r{a}: r{a} -= 1")
+            pc += 1
+        elif op == OP_SE and acelerar and pc in cp.lacos:
+            # todas as voltas de uma vez; depois o contador é zero e segue o "entao"
+            laco = cp.lacos[pc]
+            c = laco.contador
+            saida.append(f"{recuo}k = r{c}")
+            saida.append(f"{recuo}if k:")
+            saida.append(f"{recuo}    r{c} = 0")
+            for r, n in laco.incrementos:
+                saida.append(f"{recuo}    r{r} += {'k' if n == 1 else f'k * {n}'}")
+            for r, n in laco.decrementos:
+                saida.append(f"{recuo}    r{r} = r{r} - {'k' if n == 1 else f'k * {n}'}")
+                saida.append(f"{recuo}    if r{r} < 0: r{r} = 0")
+            saida.append(f"{recuo}    passos += {'k' if laco.passos == 1 else f'k * {laco.passos}'}")
+            pc += 1
+        elif op == OP_SE:
+            saida.append(f"{recuo}if not r{a}:")
+            _gerar_linha(cp, pc + 1, saida, nivel + 1, posicao, atual, nomes, leitura, escrita, locais, acelerar)
+            saida.append(f"{recuo}else:")
+            _gerar_linha(cp, cp.alvos[pc], saida, nivel + 1, posicao, atual, nomes, leitura, escrita, locais, acelerar)
+            return
+        elif op == OP_VA:
+            destino = cp.linhas[cp.alvos[pc]]
+            saida.append(f"{recuo}L = {destino}")
+            if posicao[destino] <= atual:
+                saida.append(f"{recuo}continue")
+            return
+        elif op == OP_MACRO:
+            chamado = cp.macros[a]
+            for r in leitura[chamado]:
+                if r in locais:
+                    saida.append(f"{recuo}v[{r}] = r{r}")
+            saida.append(f"{recuo}passos = {nomes[chamado]}(v, passos)")
+            for r in escrita[chamado]:
+                if r in locais:
+                    saida.append(f"{recuo}r{r} = v[{r}]")
+            pc += 1
+        else:
+            saida.append(f"{recuo}break")   # fim do programa ou linha com erro
+            return
+
+
+def _gerar_funcao(
+    cp: ProgramaCompilado,
+    nome: str,
+    nomes: Dict[str, str],
+    leitura: Dict[str, Tuple[int, ...]],
+    escrita: Dict[str, Tuple[int, ...]],
+    acelerar: bool,
+) -> List[str]:
+    saida = [f"def {nome}(v, passos):"]
+    if not cp.inicio:
+        return saida + ["    return passos"]
+
+    locais = sorted({cp.args[pc] for pc, op in enumerate(cp.ops) if op in (OP_ADD, OP_SUB, OP_SE)})
+    for r in locais:
+        saida.append(f"    r{r} = v[{r}]")
+    linhas = sorted(cp.inicio)
+    posicao = {ln: i for i, ln in enumerate(linhas)}
+    saida.append(f"    L = {linhas[0]}")
+    saida.append("    while True:")
+    agrupar = len(linhas) > LINHAS_POR_GRUPO
+    for inicio in range(0, len(linhas), LINHAS_POR_GRUPO):
+        grupo = linhas[inicio:inicio + LINHAS_POR_GRUPO]
+        nivel = 2
+        if agrupar:
+            saida.append(f"        if L <= {grupo[-1]}:")
+            nivel = 3
+        for ln in grupo:
+            recuo = "    " * nivel
+            saida.append(f"{recuo}if L == {ln}:")
+            saida.append(f"{recuo}    passos += 1")
+            _gerar_linha(cp, cp.inicio[ln], saida, nivel + 1, posicao, posicao[ln],
+                         nomes, leitura, escrita, set(locais), acelerar)
+    # a última linha sempre termina num salto, "break" ou "continue"
+    for r in locais:
+        if any(cp.args[pc] == r for pc, op in enumerate(cp.ops) if op in (OP_ADD, OP_SUB)):
+            saida.append(f"    v[{r}] = r{r}")
+    saida.append("    return passos")
+    return saida
+
+
+def _chave(bib: Biblioteca, fecho: List[int], acelerar: bool) -> str:
+    h = hashlib.sha1(f"{VERSAO_GERADOR}|{sys.implementation.cache_tag}|{bib.n_regs}|{acelerar}".encode())
+    for pid in fecho:
+        cp = bib.compilados[pid]
+        h.update(f"\0{cp.arquivo}\0{sorted((bib.fontes[pid] or {}).items())!r}".encode())
+    return h.hexdigest()
+
+
+def _chamadas_profundas(raiz: str, grafo: Dict[str, List[str]], interpretados: Set[str]) -> Set[str]:
+    # profundidade de chamadas Python de cada função gerada, em ordem topológica
+    # (sem as recursivas o grafo é acíclico); quem passa do limite é interpretado
+    gerados = {nome for nome in grafo if nome not in interpretados}
+    entradas = {nome: 0 for nome in gerados}
+    for nome in gerados:
+        for chamado in set(grafo[nome]):
+            if chamado in gerados:
+                entradas[chamado] += 1
+    profundidade = {raiz: 1}
+    profundas: Set[str] = set()
+    prontos = [nome for nome in gerados if entradas[nome] == 0]
+    while prontos:
+        nome = prontos.pop()
+        nivel = profundidade.get(nome, 0)
+        if nivel > LIMITE_CHAMADAS:
+            profundas.add(nome)
+        for chamado in set(grafo[nome]):
+            if chamado not in gerados:
+                continue
+            if nivel and nome not in profundas:
+                profundidade[chamado] = max(profundidade.get(chamado, 0), nivel + 1)
+            entradas[chamado] -= 1
+            if entradas[chamado] == 0:
+                prontos.append(chamado)
+    return profundas
+
+
+def gerar_fonte(bib: Biblioteca, arquivo: str, acelerar: bool = True) -> Tuple[str, Set[str]]:
+    # devolve o código gerado e os programas que ficam com o interpretador
+    fecho = bib.fecho(bib.id_de(arquivo))
+    compilados = {bib.compilados[pid].arquivo: bib.compilados[pid] for pid in fecho}
+    leitura_pid, escrita_pid = registradores_por_programa(bib)
+    leitura = {bib.compilados[pid].arquivo: leitura_pid[pid] for pid in fecho}
+    escrita = {bib.compilados[pid].arquivo: escrita_pid[pid] for pid in fecho}
+    grafo = {nome: list(cp.macros) for nome, cp in compilados.items()}
+    interpretados = {nome for componente in componentes_recursivas(grafo) for nome in componente}
+    interpretados |= _chamadas_profundas(arquivo, grafo, interpretados)
+
+    nomes: Dict[str, str] = {}
+    for i, nome in enumerate(compilados):
+        nomes[nome] = f"f{i}"
+    funcoes: List[str] = []
+    for nome, cp in compilados.items():
+        if nome in interpretados:
+            continue
+        try:
+            funcoes.extend(_gerar_funcao(cp, nomes[nome], nomes, leitura, escrita, acelerar))
+        except _AninhamentoExcessivo:
+            interpretados.add(nome)
+            continue
+        funcoes.append("")
+    for nome in sorted(interpretados):
+        funcoes.append(f"def {nomes[nome]}(v, passos):")
+        funcoes.append(f"    return _interpretar({nome!r}, v, passos)")
+        funcoes.append("")
+    return "\n".join(funcoes), interpretados
+
+
+# ======================================
+# Cache: em memória por biblioteca e em disco pelo hash dos programas
+# ======================================
+LIMITE_CACHE_TRANSPILADOS = 8
+_transpilados: Dict[Tuple[int, str, bool, bool], Tuple[Biblioteca, List[Tuple[int, ProgramaCompilado]], Callable]] = {}
+
+
+def _ler_codigo(caminho: str):
+    try:
+        with open(caminho, "rb") as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _gravar_codigo(caminho: str, codigo) -> None:
+    # grava num temporário e renomeia: leitores concorrentes nunca veem meio arquivo
+    try:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "wb") as f:
+            marshal.dump(codigo, f)
+        os.replace(temporario, caminho)
+    except OSError:
+        pass   # sem cache em disco (pasta somente leitura, por exemplo)
+
+
+def transpilar(
+    bib: Biblioteca,
+    arquivo: str,
+    acelerar: bool = True,
+    pasta_cache: Optional[str] = PASTA_CACHE,
+    memoizar: bool = True,
+) -> Callable:
+    # devolve f(valores, passos) -> passos, que altera a lista de valores no lugar;
+    # memoizar vale para os programas que ficam com o interpretador
+    chave_memoria = (id(bib), arquivo, acelerar, memoizar)
+    salvo = _transpilados.pop(chave_memoria, None)
+    if salvo is not None and salvo[0] is bib and all(bib.compilados[p] is cp for p, cp in salvo[1]):
+        _transpilados[chave_memoria] = salvo
+        return salvo[2]
+
+    fecho = bib.fecho(bib.id_de(arquivo))
+    chave = _chave(bib, fecho, acelerar)
+    caminho = os.path.join(pasta_cache, f"{chave}.bin") if pasta_cache else None
+    codigo = _ler_codigo(caminho) if caminho else None
+    if codigo is None:
+        fonte, _ = gerar_fonte(bib, arquivo, acelerar)
+        codigo = compile(fonte, f"<norma:{arquivo}>", "exec")
+        if caminho:
+            _gravar_codigo(caminho, codigo)
+
+    def _interpretar(nome: str, v: List[int], passos: int) -> int:
+        ex = Execucao(bib, nome, v)
+        ex.rodar(acelerar=acelerar, memoizar=memoizar)
+        return passos + ex.passos
+
+    modulo = {"_interpretar": _interpretar}
+    exec(codigo, modulo)
+    funcao = modulo["f0"]
+    _transpilados[chave_memoria] = (bib, [(p, bib.compilados[p]) for p in fecho], funcao)
+    while len(_transpilados) > LIMITE_CACHE_TRANSPILADOS:
+        del _transpilados[next(iter(_transpilados))]
+    return funcao
+
+
+# ======================================
+# Motor transpilado com a mesma assinatura de norma.executar
+# ======================================
+def executar(
+    programas: Dict[str, Dict[int, str]],
+    regs: Registradores,
+    arquivo: str = "main.txt",
+    log: bool = False,
+    acelerar: bool = True,
+    memoizar: bool = True,
+) -> None:
+    # com log cada linha precisa ser impressa: usa o interpretador
+    if log:
+        executar_interpretado(programas, regs, arquivo, log=True, memoizar=memoizar)
+        return
+    valores = _abrir_registradores(regs)
+    try:
+        transpilar(obter_biblioteca(programas, len(regs)), arquivo, acelerar, memoizar=memoizar)(valores, 0)
+    finally:
+        _devolver_registradores(regs, valores)
+
+
+if __name__ == "__main__":
+    # imprime o código gerado: python transpilar.py [arquivo] [pasta]
+    from norma import ler_programas
+    arquivo = sys.argv[1] if len(sys.argv) > 1 else "main.txt"
+    programas = ler_programas(sys.argv[2] if len(sys.argv) > 2 else "macros")
+    fonte, interpretados = gerar_fonte(Biblioteca(programas, 7), arquivo)
+    print(fonte)
+    if interpretados:
+        print(f"# interpretados: {', '.join(sorted(interpretados))}")
@@ -0,0 +1,309 @@
+import sys
+import time
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from norma import (
+    OP_ADD, OP_SUB, OP_SE, OP_VA, OP_MACRO, OP_FIM, OP_ABORTA, OP_LACO,
+    Biblioteca, Execucao, ler_programas,
+)
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: só este motor depende dele
+    np = None
+
+# ======================================
+# Código achatado: todos os programas da biblioteca num único vetor
+# ======================================
+class CodigoAchatado:
+    __slots__ = ("bib", "ops", "args", "alvos", "entra", "lacos", "inicio", "entra_inicio", "deslocamentos")
+
+    def __init__(self, bib: Biblioteca, arquivo: str, acelerar: bool):
+        self.bib = bib
+        pid_inicial = bib.id_de(arquivo)
+        deslocamentos: List[int] = []
+        total = 0
+        for cp in bib.compilados:
+            deslocamentos.append(total)
+            total += len(cp.ops)
+
+        self.ops: List[int] = []
+        self.args: List[int] = []
+        self.alvos: List[int] = []
+        self.entra: List[bool] = []   # a chamada desta instrução conta um passo (macro não vazia)?
+        self.lacos = {}
+        for pid, cp in enumerate(bib.compilados):
+            base = deslocamentos[pid]
+            ops = cp.ops_otimizados if acelerar else cp.ops
+            for pc, op in enumerate(ops):
+                alvo = cp.alvos[pc] + base
+                if op == OP_MACRO:
+                    chamado = bib.chamadas[pid][cp.args[pc]]
+                    alvo = deslocamentos[chamado]
+                    self.entra.append(bool(bib.compilados[chamado].inicio))
+                else:
+                    self.entra.append(False)
+                self.ops.append(op)
+                self.args.append(cp.args[pc])
+                self.alvos.append(alvo)
+                if op == OP_LACO:
+                    self.lacos[pc + base] = cp.lacos[pc]
+        self.inicio = deslocamentos[pid_inicial]
+        self.entra_inicio = bool(bib.compilados[pid_inicial].inicio)
+        self.deslocamentos = deslocamentos
+
+    def local(self, pc: int) -> Tuple[int, int]:
+        # (programa, pc no programa) de um endereço do vetor achatado
+        pid = bisect_right(self.deslocamentos, pc) - 1
+        return pid, pc - self.deslocamentos[pid]
+
+
+# ======================================
+# Motor vetorizado: N entradas em passo travado sobre uma matriz (N, R)
+# ======================================
+# Cada volta custa algumas chamadas ao numpy, qualquer que seja o número de
+# linhas ativas: quando restam menos de MINIMO_ATIVOS, as linhas seguem no
+# interpretador escalar a partir do estado em que estão. Os registradores são
+# int64; uma linha cujo valor passaria de 2**63 - 1 é refeita desde o início no
+# interpretador escalar (inteiros do Python) e o resultado passa a ser uma
+# matriz de objetos se algum valor não couber em int64.
+MINIMO_ATIVOS = 512
+MAXIMO_INT64 = (1 << 63) - 1
+
+
+def executar_vetorizado(
+    programas: Dict[str, Dict[int, str]],
+    arquivo: str,
+    entradas: Iterable[Sequence[int]],
+    n_regs: int = 7,
+    limite_passos: Optional[int] = None,
+    acelerar: bool = True,
+    minimo_ativos: int = MINIMO_ATIVOS,
+):
+    # devolve (registradores finais (N, R), passos (N,), concluidos (N,))
+    if np is None:
+        raise ImportError("O motor vetorizado precisa do pacote numpy (pip install numpy).")
+
+    codigo = CodigoAchatado(Biblioteca(programas, n_regs), arquivo, acelerar)
+    ops = np.array(codigo.ops, dtype=np.int64)
+    args = np.array(codigo.args, dtype=np.int64)
+    alvos = np.array(codigo.alvos, dtype=np.int64)
+    entra = np.array(codigo.entra, dtype=bool)
+
+    # laços acelerados como tabelas densas indexadas pelo pc
+    indice_laco = np.zeros(len(codigo.ops), dtype=np.int64)
+    contador = np.zeros(len(codigo.lacos), dtype=np.int64)
+    passos_laco = np.ones(len(codigo.lacos), dtype=np.int64)
+    incrementos = np.zeros((len(codigo.lacos), n_regs), dtype=np.int64)
+    decrementos = np.zeros((len(codigo.lacos), n_regs), dtype=np.int64)
+    for li, (pc_laco, laco) in enumerate(codigo.lacos.items()):
+        indice_laco[pc_laco] = li
+        contador[li] = laco.contador
+        passos_laco[li] = laco.passos
+        for r, c in laco.incrementos:
+            incrementos[li, r] = c
+        for r, c in laco.decrementos:
+            decrementos[li, r] = c
+
+    linhas = [[int(v) for v in e] for e in entradas]
+    if any(len(e) > n_regs for e in linhas):
+        raise ValueError(f"Entradas com mais de {n_regs} registradores.")
+    if limite_passos is not None and limite_passos > MAXIMO_INT64:
+        limite_passos = None
+    n = len(linhas)
+    regs = np.zeros((n, n_regs), dtype=np.int64)
+    escalares: List[int] = []    # linhas refeitas do início no interpretador escalar
+    for i, e in enumerate(linhas):
+        if any(v > MAXIMO_INT64 for v in e):
+            escalares.append(i)
+        else:
+            regs[i, :len(e)] = e
+    celulas = regs.reshape(-1)   # visão achatada: índice = entrada * R + registrador
+    limite = MAXIMO_INT64 if limite_passos is None else limite_passos
+
+    pc = np.full(n, codigo.inicio, dtype=np.int64)
+    passos = np.zeros(n, dtype=np.int64)
+    concluidos = np.zeros(n, dtype=bool)
+    pilha = np.zeros((n, 8), dtype=np.int64)   # endereços de retorno por entrada
+    profundidade = np.zeros(n, dtype=np.int64)
+    ativos = np.setdiff1d(np.arange(n), escalares)
+    transferidas: List[int] = []    # linhas que seguem no escalar a partir do estado atual
+
+    if codigo.entra_inicio:
+        ok = passos[ativos] < limite
+        passos[ativos[ok]] += 1
+        ativos = ativos[ok]
+
+    # a cada volta, cada entrada ativa executa uma instrução; as atualizações
+    # são mascaradas por opcode, então o custo não cresce com a divergência dos pcs
+    while ativos.size:
+        p = pc[ativos]
+        op = ops[p]
+        parar = np.zeros(ativos.size, dtype=bool)
+        transbordou = np.zeros(ativos.size, dtype=bool)
+
+        m = np.flatnonzero(op == OP_ADD)
+        if m.size:
+            rows, pm = ativos[m], p[m]
+            i = rows * n_regs + args[pm]
+            cheio = celulas[i] == MAXIMO_INT64
+            if cheio.any():
+                transbordou[m[cheio]] = True
+                rows, pm, i = rows[~cheio], pm[~cheio], i[~cheio]
+            celulas[i] += 1
+            pc[rows] = pm + 1
+
+        m = np.flatnonzero(op == OP_SUB)
+        if m.size:
+            rows, pm = ativos[m], p[m]
+            i = rows * n_regs + args[pm]
+            celulas[i] = np.maximum(celulas[i] - 1, 0)
+            pc[rows] = pm + 1
+
+        m = np.flatnonzero(op == OP_SE)
+        if m.size:
+            rows, pm = ativos[m], p[m]
+            pc[rows] = np.where(celulas[rows * n_regs + args[pm]] == 0, pm + 1, alvos[pm])
+
+        m = np.flatnonzero(op == OP_LACO)
+        if m.size:
+            rows, pm = ativos[m], p[m]
+            li = indice_laco[pm]
+            x = contador[li]
+            voltas = regs[rows, x]
+            k = np.minimum(voltas, (limite - passos[rows]) // passos_laco[li])
+            # k * incremento não pode passar do espaço que resta em cada registrador;
+            # sem limite de passos, o próprio contador de passos também não
+            inc = incrementos[li]
+            folga = (MAXIMO_INT64 - regs[rows]) // np.maximum(inc, 1)
+            cheio = ((inc > 0) & (k[:, None] > folga)).any(axis=1)
+            if limite_passos is None:
+                cheio |= k < voltas
+            if cheio.any():
+                transbordou[m[cheio]] = True
+                rows, pm, li, x, k, inc = rows[~cheio], pm[~cheio], li[~cheio], x[~cheio], k[~cheio], inc[~cheio]
+            regs[rows, x] -= k
+            bloco = regs[rows] + k[:, None] * inc
+            dec = decrementos[li]
+            # se k * decremento passa do valor o resultado é zero (e o produto, que pode
+            # estourar o int64, é descartado)
+            zera = k[:, None] > bloco // np.maximum(dec, 1)
+            bloco = np.where(dec > 0, np.where(zera, 0, bloco - k[:, None] * dec), bloco)
+            regs[rows] = bloco
+            passos[rows] += k * passos_laco[li]
+            pc[rows] = np.where(regs[rows, x] == 0, pm + 1, alvos[pm])
+
+        m = np.flatnonzero((op == OP_VA) | (op == OP_MACRO))
+        if m.size:
+            rows, pm = ativos[m], p[m]
+            chamada = op[m] == OP_MACRO
+            if chamada.any():
+                cr = rows[chamada]
+                prof = profundidade[cr]
+                if prof.max() + 1 >= pilha.shape[1]:
+                    pilha = np.concatenate([pilha, np.zeros_like(pilha)], axis=1)
+                pilha[cr, prof] = pm[chamada] + 1
+                profundidade[cr] = prof + 1
+            pc[rows] = alvos[pm]
+            # início de linha: conta um passo ou para por limite
+            conta = ~chamada | entra[pm]
+            esgotados = conta & (passos[rows] >= limite)
+            passos[rows[conta & ~esgotados]] += 1
+            if limite_passos is None:
+                transbordou[m[esgotados]] = True
+            else:
+                parar[m[esgotados]] = True
+            if ativos.size < minimo_ativos:
+                # no início de uma linha a linha pode seguir no interpretador escalar
+                saem = m[conta & ~esgotados]
+                transferidas.extend(ativos[saem].tolist())
+                parar[saem] = True
+
+        m = np.flatnonzero((op == OP_FIM) | (op == OP_ABORTA))
+        if m.size:
+            rows = ativos[m]
+            fim_total = profundidade[rows] == 0
+            concluidos[rows[fim_total]] = True
+            parar[m[fim_total]] = True
+            retornam = rows[~fim_total]
+            profundidade[retornam] -= 1
+            pc[retornam] = pilha[retornam, profundidade[retornam]]
+
+        if transbordou.any():
+            escalares.extend(ativos[transbordou].tolist())
+            parar |= transbordou
+        if parar.any():
+            ativos = ativos[~parar]
+
+    resultados = []
+    for i in transferidas:
+        # a linha já foi contada pelo motor vetorizado: o escalar volta um passo e a conta de novo
+        ex = Execucao(codigo.bib, arquivo, regs[i].tolist())
+        quadros = [codigo.local(int(e)) for e in pilha[i, :profundidade[i]]]
+        ex.pilha = [(pid, pc_ret, None, 0) for pid, pc_ret in quadros]
+        ex.pid, ex.pc = codigo.local(int(pc[i]))
+        ex.passos = int(passos[i]) - 1
+        ex.rodar(None if limite_passos is None else limite_passos - ex.passos, acelerar=acelerar, memoizar=False)
+        resultados.append((i, ex))
+    for i in escalares:
+        ex = Execucao(codigo.bib, arquivo, linhas[i] + [0] * (n_regs - len(linhas[i])))
+        ex.rodar(limite_passos, acelerar=acelerar, memoizar=False)
+        resultados.append((i, ex))
+
+    if any(max(ex.valores, default=0) > MAXIMO_INT64 or ex.passos > MAXIMO_INT64 for _, ex in resultados):
+        regs, passos = regs.astype(object), passos.astype(object)
+    for i, ex in resultados:
+        regs[i] = ex.valores
+        passos[i] = ex.passos
+        concluidos[i] = ex.concluida
+    return regs, passos, concluidos
+
+
+# ======================================
+# Conformidade: compara com o interpretador escalar
+# ======================================
+def verificar_conformidade(
+    programas: Dict[str, Dict[int, str]],
+    arquivo: str,
+    entradas: List[Sequence[int]],
+    n_regs: int = 7,
+    limite_passos: Optional[int] = None,
+    acelerar: bool = True,
+    minimo_ativos: int = MINIMO_ATIVOS,
+) -> List[Tuple[Sequence[int], Tuple[int, ...], Tuple[int, ...]]]:
+    # a referência é o interpretador escalar (inteiros do Python), sem memo
+    regs, passos, concluidos = executar_vetorizado(
+        programas, arquivo, entradas, n_regs, limite_passos, acelerar, minimo_ativos,
+    )
+    bib = Biblioteca(programas, n_regs)
+    divergencias = []
+    for i, entrada in enumerate(entradas):
+        ex = Execucao(bib, arquivo, list(entrada) + [0] * (n_regs - len(entrada)))
+        ex.rodar(limite_passos, memoizar=False)
+        esperado = tuple(ex.valores) + (ex.passos, ex.concluida)
+        obtido = tuple(regs[i].tolist()) + (int(passos[i]), bool(concluidos[i]))
+        if esperado != obtido:
+            divergencias.append((entrada, esperado, obtido))
+    return divergencias
+
+
+if __name__ == "__main__":
+    # mesmas condições nos dois lados: sem memo (o motor vetorizado não tem) e com a
+    # aceleração de laços ligada ou desligada em ambos
+    programas = ler_programas(sys.argv[1] if len(sys.argv) > 1 else "macros")
+    grade = [[a, b] for a in range(40) for b in range(40)]
+    for acelerar in (True, False):
+        print(f"aceleração de laços: {'ligada' if acelerar else 'desligada'}")
+        for arquivo in ("maior_a_b.txt", "menor_a_b.txt", "multi.txt", "pot.txt", "exemplomacro.txt"):
+            entradas = [[a % 6, b % 6] for a, b in grade] if arquivo == "pot.txt" else grade
+            erros = verificar_conformidade(programas, arquivo, entradas, limite_passos=50_000, acelerar=acelerar)
+            inicio = time.perf_counter()
+            executar_vetorizado(programas, arquivo, entradas, acelerar=acelerar)
+            vetorizado = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            bib = Biblioteca(programas, 7)
+            for entrada in entradas:
+                Execucao(bib, arquivo, entrada + [0] * 5).rodar(acelerar=acelerar, memoizar=False)
+            escalar = time.perf_counter() - inicio
+            print(f"  {arquivo:<18} entradas={len(entradas):>5} divergências={len(erros):>3} "
+                  f"vetorizado={vetorizado:.3f}s escalar={escalar:.3f}s")